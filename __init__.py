@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+from pathlib import Path
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     CONF_HORIZON,
@@ -14,10 +20,22 @@ from .const import (
     DEFAULT_HORIZON,
     DEFAULT_WEATHER_MODEL,
     DOMAIN,
+    SIGNAL_OPTIONS_UPDATED,
+    STORAGE_VERSION,
 )
+from .coordinator import OpenMeteoPVForecastCoordinator
+from .services import async_setup_services
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the Open-Meteo PV Forecast services."""
+    await async_setup_services(hass)
+    return True
+
 
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Migrate old entry."""
@@ -34,15 +52,32 @@ async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
-    """Set up Open-Meteo PV Forecast from a config entry."""
+    """Set up Open-Meteo PV Forecast from a config entry.
+
+    Sensors are added right away with their restored state. The model is
+    imported and the first forecast fetched once Home Assistant has started,
+    so neither adds to boot time.
+    """
     if entry.version < 2:
         if not await async_migrate_entry(hass, entry):
             return False
 
+    coordinator = OpenMeteoPVForecastCoordinator(hass, entry)
+
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = entry.options
+    hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    @callback
+    def _async_start(hass: HomeAssistant) -> None:
+        """Start forecasting in the background."""
+        entry.async_create_background_task(
+            hass, coordinator.async_start(), f"{DOMAIN}_{entry.entry_id}_start"
+        )
+
+    entry.async_on_unload(async_at_started(hass, _async_start))
 
     return True
 
@@ -54,3 +89,24 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.data[DOMAIN].pop(entry.entry_id)
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the forecast archive and learned bias of a removed entry."""
+    directory = Path(hass.config.path(STORAGE_DIR, DOMAIN))
+
+    def _remove_archive() -> None:
+        for path in directory.glob(f"archive_{entry.entry_id}*"):
+            path.unlink(missing_ok=True)
+
+    await hass.async_add_executor_job(_remove_archive)
+    await Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.bias").async_remove()
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options in place, reloading only for a new weather model."""
+    coordinator: OpenMeteoPVForecastCoordinator = hass.data[DOMAIN][entry.entry_id]
+    if not await coordinator.async_apply_options():
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    async_dispatcher_send(hass, f"{SIGNAL_OPTIONS_UPDATED}_{entry.entry_id}")
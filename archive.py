@@ -0,0 +1,205 @@
+"""On-disk archive of issued forecasts as a memory-mapped ring buffer."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+from pathlib import Path
+import time
+from typing import Any
+
+import numpy as np
+
+from .solar_forecast import ForecastData
+
+_LOGGER = logging.getLogger(__name__)
+
+ARCHIVE_VERSION = 1
+
+
+def archive_layout(
+    data: ForecastData, slots: int, interval: int
+) -> dict[str, Any]:
+    """Return the record layout for forecasts shaped like ``data``.
+
+    Records of one file share this layout; a forecast with a different one
+    starts a new file.
+    """
+    return {
+        "version": ARCHIVE_VERSION,
+        "slot_seconds": data.slot_seconds,
+        "slots": slots,
+        "interval": interval,
+        "stat_keys": list(data.stat_keys),
+        "string_names": list(data.string_names),
+        "inverter_names": list(data.inverter_names),
+    }
+
+
+def record_dtype(layout: dict[str, Any]) -> np.dtype:
+    """Return the fixed-size record type for a layout.
+
+    ``issued`` is the issue time rounded down to the update interval and 0
+    for an empty record, ``first`` the end of the first slot, both as unix
+    seconds. ``stats`` has shape (stats, rows, slots) in float32.
+    """
+    rows = len(layout["string_names"]) + len(layout["inverter_names"]) + 1
+    return np.dtype(
+        [
+            ("issued", "<i8"),
+            ("first", "<i8"),
+            ("stats", "<f4", (len(layout["stat_keys"]), rows, layout["slots"])),
+        ]
+    )
+
+
+class ForecastArchive:
+    """Fixed-record ring buffer of forecast statistics in a ``.npy`` file.
+
+    Each update interval owns one record at ``issued // interval % capacity``,
+    so writing and looking up a run by its issue time is O(1) and the file
+    never grows. Runs older than ``capacity`` intervals are overwritten. The
+    file is a plain structured ``.npy`` array and can be opened with
+    ``np.load(path, mmap_mode="r")``; its layout is stored next to it as JSON.
+    """
+
+    def __init__(
+        self, path: Path, layout: dict[str, Any], records: np.memmap
+    ) -> None:
+        """Initialize the archive."""
+        self.path = path
+        self.layout = layout
+        self.interval: int = layout["interval"]
+        self._records = records
+
+    @property
+    def capacity(self) -> int:
+        """Number of records in the ring buffer."""
+        return len(self._records)
+
+    @classmethod
+    def open(
+        cls, path: Path, layout: dict[str, Any], capacity: int
+    ) -> ForecastArchive:
+        """Open the archive at ``path``, creating or converting it as needed.
+
+        An archive with another layout is kept as ``<name>_previous.npy``,
+        replacing an older one there, so at most one superseded archive is
+        left on disk. One with another capacity is resized, keeping the
+        newest runs.
+        """
+        meta_path = path.with_suffix(".json")
+        dtype = record_dtype(layout)
+        stored: dict[str, Any] | None = None
+        if path.exists() and meta_path.exists():
+            stored = json.loads(meta_path.read_text())
+
+        if stored is not None and stored != layout:
+            previous = path.with_stem(path.stem + "_previous")
+            _LOGGER.info(
+                "Forecast layout changed, starting new archive %s and keeping "
+                "the old one as %s",
+                path,
+                previous,
+            )
+            os.replace(path, previous)
+            os.replace(meta_path, previous.with_suffix(".json"))
+            stored = None
+
+        if stored is None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            records = np.lib.format.open_memmap(
+                path, mode="w+", dtype=dtype, shape=(capacity,)
+            )
+            meta_path.write_text(json.dumps(layout))
+            return cls(path, layout, records)
+
+        records = np.load(path, mmap_mode="r+")
+        if len(records) != capacity:
+            records = cls._resize(path, records, capacity, layout["interval"])
+        return cls(path, layout, records)
+
+    @staticmethod
+    def _resize(
+        path: Path, records: np.memmap, capacity: int, interval: int
+    ) -> np.memmap:
+        """Copy the newest runs into a file with a new capacity."""
+        start = time.perf_counter()
+        kept = records[records["issued"] > 0]
+        if len(kept):
+            kept = kept[kept["issued"] > kept["issued"].max() - capacity * interval]
+        temp_path = path.with_suffix(".tmp.npy")
+        resized = np.lib.format.open_memmap(
+            temp_path, mode="w+", dtype=records.dtype, shape=(capacity,)
+        )
+        resized[kept["issued"] // interval % capacity] = kept
+        resized.flush()
+        del records, kept, resized
+        os.replace(temp_path, path)
+        _LOGGER.debug(
+            "Resized forecast archive to %d records in %.1f ms",
+            capacity,
+            (time.perf_counter() - start) * 1000,
+        )
+        return np.load(path, mmap_mode="r+")
+
+    def _index(self, issued: float) -> tuple[int, int]:
+        """Return the record index and rounded issue time."""
+        bucket = int(issued) // self.interval
+        return bucket % self.capacity, bucket * self.interval
+
+    def append(self, issued: float, data: ForecastData) -> None:
+        """Write the statistics of a run straight into its mapped record.
+
+        The record is marked empty while it is written, so an interrupted
+        write never leaves a run that looks complete.
+        """
+        index, issued_at = self._index(issued)
+        slots = min(len(data.times), self.layout["slots"])
+        record = self._records[index : index + 1]
+        record["issued"] = 0
+        record["first"] = int(data.times[0])
+        stats = record["stats"][0]
+        stats[..., :slots] = data.stats[..., :slots]
+        stats[..., slots:] = np.nan
+        record["issued"] = issued_at
+        self._records.flush()
+
+    def lookup(self, issued: float) -> tuple[np.ndarray, np.ndarray] | None:
+        """Return slot ends and statistics of the run issued at ``issued``.
+
+        The statistics are a read-only view into the mapped file with shape
+        (stats, rows, slots).
+        """
+        index, issued_at = self._index(issued)
+        record = self._records[index]
+        if record["issued"] != issued_at:
+            return None
+        slot_seconds = self.layout["slot_seconds"]
+        times = record["first"] + slot_seconds * np.arange(self.layout["slots"])
+        stats = self._records["stats"][index]
+        stats.flags.writeable = False
+        return times, stats
+
+    def runs(
+        self, start: float, end: float
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return all runs issued in [start, end), oldest first.
+
+        Returns issue times (runs,), slot ends (runs, slots) and a copy of
+        the statistics (runs, stats, rows, slots), read in one gather.
+        """
+        issued = self._records["issued"]
+        indices = np.flatnonzero((issued > 0) & (issued >= start) & (issued < end))
+        records = self._records[indices[np.argsort(issued[indices])]]
+        slot_seconds = self.layout["slot_seconds"]
+        times = records["first"][:, np.newaxis] + slot_seconds * np.arange(
+            self.layout["slots"]
+        )
+        return records["issued"], times, records["stats"]
+
+    def issue_times(self) -> np.ndarray:
+        """Return the issue times of all archived runs, oldest first."""
+        issued = self._records["issued"]
+        return np.sort(issued[issued > 0])
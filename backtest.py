@@ -0,0 +1,367 @@
+"""Backtest of the PV model against recorded production."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from datetime import datetime
+from functools import partial
+from typing import Any
+
+import aiohttp
+import numpy as np
+
+from homeassistant.components.recorder import get_instance, history
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, State
+from homeassistant.exceptions import HomeAssistantError, ServiceValidationError
+from homeassistant.util import dt as dt_util
+
+from .bias import SensorLink, convert_reading, sensor_links, sensor_value
+from .config_flow import Plant
+from .const import DOMAIN, STAT_MEDIAN, WEATHER_MODELS
+from .coordinator import OpenMeteoPVForecastCoordinator, async_fetch_ensemble
+from .solar_forecast import compute_forecast, ensemble_inputs
+
+# Fraction of a slot that must be covered by valid power readings
+MIN_SLOT_COVERAGE = 0.9
+
+
+def state_arrays(states: Sequence[State]) -> tuple[np.ndarray, np.ndarray, bool]:
+    """Convert recorded states to change times, values in W or Wh and kind.
+
+    Unavailable or non-numeric states become NaN.
+    """
+    times = np.empty(len(states))
+    values = np.full(len(states), np.nan)
+    is_energy = False
+    for index, state in enumerate(states):
+        times[index] = state.last_changed.timestamp()
+        if (value := sensor_value(state)) is None:
+            continue
+        if (converted := convert_reading(*value)) is not None:
+            values[index], is_energy = converted
+    return times, values, is_energy
+
+
+def slot_means(
+    slot_ends: np.ndarray,
+    slot_seconds: int,
+    times: np.ndarray,
+    values: np.ndarray,
+    is_energy: bool,
+    until: float | None = None,
+) -> np.ndarray:
+    """Return the mean power in W per slot from step-wise sensor history.
+
+    Power readings are integrated as a step function, energy counters are
+    differenced at the slot boundaries. Slots without sufficient data are
+    NaN, as are slots ending after ``until``: the last reading would be
+    carried into time that was never recorded. All slots are evaluated in
+    one vectorized pass.
+    """
+    means = _step_means(slot_ends, slot_seconds, times, values, is_energy)
+    if until is not None:
+        means[slot_ends > until] = np.nan
+    return means
+
+
+def _step_means(
+    slot_ends: np.ndarray,
+    slot_seconds: int,
+    times: np.ndarray,
+    values: np.ndarray,
+    is_energy: bool,
+) -> np.ndarray:
+    """Return the mean power per slot of a power or energy series."""
+    slot_starts = slot_ends - slot_seconds
+    if not len(times):
+        return np.full(len(slot_ends), np.nan)
+    if is_energy:
+        valid = ~np.isnan(values)
+        times, values = times[valid], values[valid]
+
+        def counter(at: np.ndarray) -> np.ndarray:
+            index = np.searchsorted(times, at, side="right") - 1
+            return np.where(index >= 0, values[np.maximum(index, 0)], np.nan)
+
+        delta = counter(slot_ends) - counter(slot_starts)
+        return np.where(delta >= 0, delta * 3600.0 / slot_seconds, np.nan)
+
+    valid = ~np.isnan(values)
+    durations = np.diff(times)
+    readings = np.where(valid, values, 0.0)
+    energy = np.concatenate(([0.0], np.cumsum(readings[:-1] * durations)))
+    covered = np.concatenate(([0.0], np.cumsum(valid[:-1] * durations)))
+
+    def integral(at: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        index = np.clip(np.searchsorted(times, at, side="right") - 1, 0, None)
+        elapsed = np.clip(at - times[index], 0, None)
+        return (
+            energy[index] + readings[index] * elapsed,
+            covered[index] + valid[index] * elapsed,
+        )
+
+    end_energy, end_covered = integral(slot_ends)
+    start_energy, start_covered = integral(slot_starts)
+    coverage = end_covered - start_covered
+    return np.where(
+        coverage >= MIN_SLOT_COVERAGE * slot_seconds,
+        (end_energy - start_energy) / np.maximum(coverage, 1),
+        np.nan,
+    )
+
+
+def crps_ensemble(members: np.ndarray, observed: np.ndarray) -> np.ndarray:
+    """Return the continuous ranked probability score of an ensemble.
+
+    ``members`` has shape (rows, members, time), ``observed`` (rows, time).
+    Uses the sorted-member form of the energy score, which is O(m log m)
+    instead of O(m²) over member pairs.
+    """
+    count = members.shape[1]
+    ranked = np.sort(members, axis=1)
+    spread_weights = (2 * np.arange(1, count + 1) - count - 1) / count**2
+    spread = np.einsum("m,rmt->rt", spread_weights, ranked)
+    return np.abs(members - observed[:, np.newaxis, :]).mean(axis=1) - spread
+
+
+def quantile_score(
+    quantiles: np.ndarray, levels: Sequence[float], observed: np.ndarray
+) -> np.ndarray:
+    """Return the CRPS approximated from forecast quantiles.
+
+    ``quantiles`` has shape (levels, ...) and ``observed`` the trailing
+    shape. The CRPS is twice the integral of the pinball loss over all
+    levels; it is estimated as twice the mean loss of the given levels.
+    """
+    tau = np.asarray(levels, dtype=float).reshape(-1, *(1,) * observed.ndim)
+    excess = quantiles - observed
+    return 2 * np.where(excess > 0, (1 - tau) * excess, -tau * excess).mean(axis=0)
+
+
+def _scores(
+    links: Sequence[SensorLink],
+    error: np.ndarray,
+    crps: np.ndarray,
+    valid: np.ndarray,
+) -> dict[str, dict[str, float | int]]:
+    """Summarize per-link errors of any shape (links, ...) where valid."""
+    error = error.reshape(len(links), -1)
+    crps = crps.reshape(len(links), -1)
+    valid = valid.reshape(len(links), -1)
+    samples = valid.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mae = np.where(valid, np.abs(error), 0).sum(axis=1) / samples
+        rmse = np.sqrt(np.where(valid, error**2, 0).sum(axis=1) / samples)
+        mean_crps = np.where(valid, crps, 0).sum(axis=1) / samples
+
+    return {
+        f"{link.kind}:{link.name}": {
+            "mae": round(float(mae[index]), 1),
+            "rmse": round(float(rmse[index]), 1),
+            "crps": round(float(mean_crps[index]), 1),
+            "samples": int(samples[index]),
+        }
+        for index, link in enumerate(links)
+        if samples[index]
+    }
+
+
+def evaluate(
+    hourly: dict[str, Any],
+    latitude: float,
+    longitude: float,
+    plant: Plant,
+    links: Sequence[SensorLink],
+    series: dict[str, tuple[np.ndarray, np.ndarray, bool]],
+    slot_seconds: int,
+    until: float | None = None,
+) -> dict[str, dict[str, float | int]]:
+    """Score a model replayed over the period against recorded production.
+
+    Every hour of the period is forecast in a single ``compute_forecast``
+    call and scored at once. Slots ending after ``until`` are skipped.
+    """
+    times, ghi, dhi, temp_air = ensemble_inputs(hourly)
+    if not len(times):
+        return {}
+    forecast = compute_forecast(
+        times,
+        ghi,
+        dhi,
+        temp_air,
+        latitude,
+        longitude,
+        plant,
+        [],
+        slot_seconds=slot_seconds,
+    )
+    members = forecast.members[[link.row for link in links]]
+    observed = np.array(
+        [
+            slot_means(times, slot_seconds, *series[link.entity_id], until=until)
+            for link in links
+        ]
+    )
+    valid = ~np.isnan(observed)
+    observed = np.where(valid, observed, 0.0)
+
+    error = forecast.stats[1, [link.row for link in links]] - observed
+    return _scores(links, error, crps_ensemble(members, observed), valid)
+
+
+def evaluate_archive(
+    issued: np.ndarray,
+    times: np.ndarray,
+    stats: np.ndarray,
+    layout: dict[str, Any],
+    links: Sequence[SensorLink],
+    series: dict[str, tuple[np.ndarray, np.ndarray, bool]],
+    until: float | None = None,
+) -> dict[str, dict[str, float | int]]:
+    """Score archived forecast runs by issue time against recorded production.
+
+    ``issued``, ``times`` and ``stats`` are as returned by
+    ``ForecastArchive.runs``. Only slots ending after the issue time of
+    their run count, so every sample was a real forecast when it was made.
+    All runs and slots are scored in one vectorized pass. The archive keeps
+    statistics, not members, so the CRPS is estimated from the median and
+    quantiles.
+    """
+    string_names = layout["string_names"]
+    rows = {("string", name): row for row, name in enumerate(string_names)}
+    rows.update(
+        (("inverter", name), len(string_names) + row)
+        for row, name in enumerate(layout["inverter_names"])
+    )
+    links = [link for link in links if (link.kind, link.name) in rows]
+    if not links or not len(issued):
+        return {}
+
+    stat_keys = layout["stat_keys"]
+    levels = {STAT_MEDIAN: 0.5}
+    levels.update((key, float(key[1:]) / 100) for key in stat_keys if key[0] == "p")
+    stat_rows = [stat_keys.index(key) for key in levels]
+
+    # (stats, links, runs, slots)
+    forecast = stats[:, stat_rows][:, :, [rows[link.kind, link.name] for link in links]]
+    forecast = forecast.transpose(1, 2, 0, 3).astype(float)
+    observed = np.array(
+        [
+            slot_means(
+                times.ravel(),
+                layout["slot_seconds"],
+                *series[link.entity_id],
+                until=until,
+            ).reshape(times.shape)
+            for link in links
+        ]
+    )
+    valid = (
+        ~np.isnan(observed)
+        & ~np.isnan(forecast).any(axis=0)
+        & (times > issued[:, np.newaxis])
+    )
+    observed = np.where(valid, observed, 0.0)
+    forecast = np.where(valid, forecast, 0.0)
+
+    crps = quantile_score(forecast, list(levels.values()), observed)
+    return _scores(links, forecast[0] - observed, crps, valid)
+
+
+async def async_backtest(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    start: datetime,
+    end: datetime,
+    model_ids: Sequence[str],
+    now: datetime | None = None,
+) -> dict[str, Any]:
+    """Backtest the configured plant for each weather model.
+
+    Runs of the configured model found in the forecast archive are scored
+    by issue time. Other models, or periods without archived runs, are
+    replayed from the ensemble API. The period ends at ``now`` at the
+    latest; it defaults to the current time and can be set for replays.
+    The recorder history of all linked production sensors is loaded once
+    and reused for every model.
+    """
+    plant = Plant.from_options(entry.options)
+    if not (links := sensor_links(plant)):
+        raise ServiceValidationError(
+            "No string or inverter is linked to an actual production sensor"
+        )
+    end = min(end, now or dt_util.utcnow())
+    if end <= start:
+        raise ServiceValidationError("The backtest period has not started yet")
+
+    entity_ids = list({link.entity_id for link in links})
+    recorded: dict[str, list[State]] = await get_instance(hass).async_add_executor_job(
+        partial(
+            history.get_significant_states,
+            hass,
+            start,
+            end,
+            entity_ids,
+            include_start_time_state=True,
+            significant_changes_only=False,
+        )
+    )
+    series = {
+        entity_id: state_arrays(recorded.get(entity_id, []))
+        for entity_id in entity_ids
+    }
+
+    coordinator: OpenMeteoPVForecastCoordinator = hass.data[DOMAIN][entry.entry_id]
+    results: dict[str, Any] = {}
+    for model_id in model_ids:
+        model = WEATHER_MODELS[model_id]
+        archive = coordinator.archive
+        if model_id == coordinator.weather_model.id and archive is not None:
+            issued, times, stats = await hass.async_add_executor_job(
+                archive.runs, start.timestamp(), end.timestamp()
+            )
+            if len(issued):
+                results[model_id] = {
+                    "source": "archive",
+                    "runs": len(issued),
+                    "targets": await hass.async_add_executor_job(
+                        evaluate_archive,
+                        issued,
+                        times,
+                        stats,
+                        archive.layout,
+                        links,
+                        series,
+                        end.timestamp(),
+                    ),
+                }
+                continue
+
+        try:
+            hourly = await async_fetch_ensemble(
+                hass,
+                model,
+                start_date=start.date().isoformat(),
+                end_date=dt_util.as_local(end).date().isoformat(),
+            )
+        except (aiohttp.ClientError, TimeoutError, KeyError) as err:
+            raise HomeAssistantError(
+                f"Error fetching Open-Meteo ensemble for {model.name}: {err}"
+            ) from err
+
+        results[model_id] = {
+            "source": "replay",
+            "targets": await hass.async_add_executor_job(
+                evaluate,
+                hourly,
+                hass.config.latitude,
+                hass.config.longitude,
+                plant,
+                links,
+                series,
+                model.resolution_hours * 3600,
+                end.timestamp(),
+            ),
+        }
+    return results
@@ -0,0 +1 @@
+"""Benchmarks for the Open-Meteo PV Forecast integration."""
@@ -0,0 +1,156 @@
+"""Memory benchmark of the forecast model.
+
+Computes forecasts for a large synthetic plant, one configuration per
+fresh process, and prints a Markdown table with:
+
+- peak RSS: ``ru_maxrss`` of the process after two refreshes, which
+  includes the interpreter, NumPy and Home Assistant imports,
+- baseline: RSS after imports and input generation, before computing,
+- held: bytes kept between refreshes (members, statistics, baseline and
+  work buffers).
+
+Inputs are random but seeded. Run it from the directory that contains the
+integration, for example ``custom_components``::
+
+    python -m openmeteo_pv_forecast.benchmarks.memory --days 2 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+
+import numpy as np
+
+from ..config_flow import Inverter, Plant, PVString
+from ..const import DEFAULT_QUANTILES
+from ..solar_forecast import WorkBuffers, compute_forecast
+
+# 2024-06-01T00:00:00Z
+START = 1717200000
+
+
+def peak_rss_mb() -> float:
+    """Return the peak resident set size of this process in MB (Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def synthetic_plant(strings: int, inverters: int) -> Plant:
+    """Return a plant with strings spread evenly over the inverters."""
+    rng = np.random.default_rng(0)
+    return Plant(
+        inverters=tuple(
+            Inverter(f"inv{index}", 10000, max_ac_w=8000) for index in range(inverters)
+        ),
+        strings=tuple(
+            PVString(
+                f"string{index}",
+                f"inv{index % inverters}",
+                float(rng.uniform(90, 270)),
+                float(rng.uniform(10, 45)),
+                2000.0,
+                tuple(rng.uniform(0, 10, 12).tolist()),
+            )
+            for index in range(strings)
+        ),
+    )
+
+
+def run(strings: int, inverters: int, members: int, days: int, compact: bool) -> dict:
+    """Measure one configuration in this process."""
+    slots = days * 24
+    times = START + 3600.0 * np.arange(1, slots + 1)
+    rng = np.random.default_rng(1)
+    daylight = np.clip(np.sin((times / 86400 % 1 - 0.25) * 2 * np.pi), 0, None)
+    ghi = 900 * daylight * rng.uniform(0.2, 1.0, size=(members, slots))
+    dhi = 0.3 * ghi
+    temp_air = rng.uniform(5, 25, size=(members, slots))
+    plant = synthetic_plant(strings, inverters)
+    buffers = WorkBuffers()
+    baseline = peak_rss_mb()
+
+    for _ in range(2):
+        data = compute_forecast(
+            times,
+            ghi,
+            dhi,
+            temp_air,
+            52.5,
+            13.4,
+            plant,
+            DEFAULT_QUANTILES,
+            compact=compact,
+            buffers=buffers,
+        )
+    held = (
+        data.members.nbytes + data.stats.nbytes + data.baseline.nbytes + buffers.nbytes
+    )
+    return {
+        "peak": peak_rss_mb(),
+        "baseline": baseline,
+        "held": held / 1024**2,
+    }
+
+
+def main() -> None:
+    """Run every configuration in its own process and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--strings", type=int, default=500)
+    parser.add_argument("--inverters", type=int, default=125)
+    parser.add_argument("--members", type=int, default=40)
+    parser.add_argument("--days", type=int, nargs="+", default=[8])
+    parser.add_argument("--child", choices=["default", "compact"])
+    args = parser.parse_args()
+    size = [str(args.strings), str(args.inverters), str(args.members)]
+
+    if args.child:
+        result = run(
+            args.strings,
+            args.inverters,
+            args.members,
+            args.days[0],
+            args.child == "compact",
+        )
+        print(json.dumps(result))
+        return
+
+    print(
+        f"{args.strings} strings, {args.inverters} inverters, "
+        f"{args.members} members, hourly slots\n"
+    )
+    print("| days | mode | peak RSS | baseline | held |")
+    print("|---|---|---|---|---|")
+    for days in args.days:
+        for mode in ("default", "compact"):
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-m",
+                    __spec__.name,
+                    "--strings",
+                    size[0],
+                    "--inverters",
+                    size[1],
+                    "--members",
+                    size[2],
+                    "--days",
+                    str(days),
+                    "--child",
+                    mode,
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            print(
+                f"| {days} | {mode} | {result['peak']:.0f} MB "
+                f"| {result['baseline']:.0f} MB | {result['held']:.0f} MB |"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Startup benchmark of the integration.
+
+Times, each in a fresh interpreter and as the median of several runs:
+
+- setup import: importing the modules loaded when Home Assistant sets up
+  the integration (``__init__``, ``sensor``, ``coordinator``, ``services``
+  and ``energy``), once cold and once with the Home Assistant modules
+  they use already imported, which leaves the cost of the integration,
+- model import: the import deferred to the first refresh (``solar_forecast``,
+  ``clearsky`` and ``archive``, including NumPy),
+- clear-sky table: building the table of a site on first use and opening
+  the cached file afterwards.
+
+Run it from the directory that contains the integration, for example
+``custom_components``::
+
+    python -m openmeteo_pv_forecast.benchmarks.startup
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PACKAGE = __package__.rpartition(".")[0]
+SETUP_MODULES = ["", ".sensor", ".coordinator", ".services", ".energy"]
+MODEL_MODULES = [".solar_forecast", ".clearsky", ".archive"]
+
+SETUP_CODE = """
+import importlib, json, sys, time
+for name in {preload!r}:
+    importlib.import_module(name)
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    "seconds": elapsed,
+    "numpy": "numpy" in sys.modules,
+    "homeassistant": sorted(
+        name for name in sys.modules if name.split(".")[0] == "homeassistant"
+    ),
+}}))
+"""
+
+MODEL_CODE = """
+import importlib, json, pathlib, time
+for name in {setup!r}:
+    importlib.import_module(name)
+start = time.perf_counter()
+for name in {modules!r}:
+    importlib.import_module(name)
+imported = time.perf_counter()
+clearsky = importlib.import_module({clearsky!r})
+directory = pathlib.Path({directory!r})
+clearsky.ClearSkyTable.load(directory, 52.5, 13.4, 34.0, 3600)
+built = time.perf_counter()
+clearsky.ClearSkyTable.load(directory, 52.5, 13.4, 34.0, 3600)
+opened = time.perf_counter()
+print(json.dumps({{
+    "import": imported - start,
+    "build": built - imported,
+    "open": opened - built,
+}}))
+"""
+
+
+def run_child(code: str, cwd: Path) -> dict:
+    """Run ``code`` in a fresh interpreter and return its JSON output."""
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        capture_output=True,
+        cwd=cwd,
+        text=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def median_ms(results: list[dict], key: str) -> str:
+    """Return the median of one timing in milliseconds."""
+    return f"{statistics.median(result[key] for result in results) * 1000:.1f} ms"
+
+
+def main() -> None:
+    """Run every measurement in fresh processes and print the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    cwd = Path(__file__).parents[2]
+    setup = [PACKAGE + name for name in SETUP_MODULES]
+    model = [PACKAGE + name for name in MODEL_MODULES]
+
+    cold = [
+        run_child(SETUP_CODE.format(preload=[], modules=setup), cwd)
+        for _ in range(args.runs)
+    ]
+    preload = cold[0]["homeassistant"]
+    warm = [
+        run_child(SETUP_CODE.format(preload=preload, modules=setup), cwd)
+        for _ in range(args.runs)
+    ]
+    deferred = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as directory:
+            code = MODEL_CODE.format(
+                setup=setup,
+                modules=model,
+                clearsky=f"{PACKAGE}.clearsky",
+                directory=directory,
+            )
+            deferred.append(run_child(code, cwd))
+
+    print(f"median of {args.runs} runs, each in a fresh interpreter\n")
+    print("| step | time |")
+    print("|---|---|")
+    print(f"| setup import, cold | {median_ms(cold, 'seconds')} |")
+    print(f"| setup import, Home Assistant loaded | {median_ms(warm, 'seconds')} |")
+    print(f"| model import (deferred) | {median_ms(deferred, 'import')} |")
+    print(f"| clear-sky table, build | {median_ms(deferred, 'build')} |")
+    print(f"| clear-sky table, open cached | {median_ms(deferred, 'open')} |")
+    print(f"\nNumPy imported during setup: {any(run['numpy'] for run in cold)}")
+
+
+if __name__ == "__main__":
+    main()
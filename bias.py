@@ -0,0 +1,298 @@
+"""Online bias correction from actual production sensors."""
+
+from __future__ import annotations
+
+from datetime import datetime
+import logging
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    ATTR_UNIT_OF_MEASUREMENT,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+    UnitOfEnergy,
+    UnitOfPower,
+)
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers.event import (
+    async_track_state_change_event,
+    async_track_utc_time_change,
+)
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.util.unit_conversion import EnergyConverter, PowerConverter
+
+from .const import DOMAIN, STORAGE_VERSION
+
+if TYPE_CHECKING:
+    from .config_flow import Plant
+    from .coordinator import OpenMeteoPVForecastCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Weight kept from previous samples on each update (memory of ~100 slots)
+BIAS_DECAY = 0.99
+# Accumulated sample weight required before a correction is applied
+BIAS_MIN_WEIGHT = 10.0
+# Slots with a smaller forecast carry no information about the bias
+BIAS_MIN_FORECAST_W = 10.0
+BIAS_FACTOR_MIN = 0.2
+BIAS_FACTOR_MAX = 3.0
+SAVE_DELAY = 600  # seconds
+
+
+def link_key(kind: str, name: str, entity_id: str) -> str:
+    """Return the storage key of a sensor link."""
+    return f"{kind}:{name}:{entity_id}"
+
+
+def sensor_value(state: State | None) -> tuple[float, str | None] | None:
+    """Return the numeric value and unit of a state, if available."""
+    if state is None or state.state in (STATE_UNAVAILABLE, STATE_UNKNOWN):
+        return None
+    try:
+        return float(state.state), state.attributes.get(ATTR_UNIT_OF_MEASUREMENT)
+    except ValueError:
+        return None
+
+
+def convert_reading(number: float, unit: str | None) -> tuple[float, bool] | None:
+    """Convert a power or energy reading to W or Wh.
+
+    Returns the converted value and whether it is an energy reading.
+    """
+    if unit in EnergyConverter.VALID_UNITS:
+        return EnergyConverter.convert(number, unit, UnitOfEnergy.WATT_HOUR), True
+    if unit in PowerConverter.VALID_UNITS:
+        return PowerConverter.convert(number, unit, UnitOfPower.WATT), False
+    return None
+
+
+class SensorLink:
+    """Track the mean production of one actual sensor per forecast slot."""
+
+    def __init__(self, kind: str, name: str, row: int, entity_id: str) -> None:
+        """Initialize the link."""
+        self.kind = kind
+        self.name = name
+        self.row = row
+        self.entity_id = entity_id
+        self.key = link_key(kind, name, entity_id)
+        self.is_energy = False
+        self.last_value: float | None = None
+        self.last_time: float | None = None
+        self.integral = 0.0
+        self.complete = False
+
+    def start(self, value: tuple[float, str | None] | None, now: float) -> None:
+        """Begin tracking at the given time; the first slot is incomplete."""
+        self.complete = False
+        self.integral = 0.0
+        self.last_time = now
+        self.last_value = self._convert(value)
+
+    def _convert(self, value: tuple[float, str | None] | None) -> float | None:
+        """Convert a reading to W or Wh."""
+        if value is None or (converted := convert_reading(*value)) is None:
+            return None
+        number, self.is_energy = converted
+        return number
+
+    def update(self, value: tuple[float, str | None] | None, now: float) -> None:
+        """Integrate a power reading up to ``now``."""
+        if self.is_energy:
+            return
+        if self.last_value is None or self.last_time is None:
+            self.complete = False
+        else:
+            self.integral += self.last_value * (now - self.last_time)
+        self.last_value = self._convert(value)
+        self.last_time = now
+
+    def close_slot(
+        self, value: tuple[float, str | None] | None, now: float, slot_seconds: int
+    ) -> float | None:
+        """Finish the slot ending at ``now`` and return its mean power in W."""
+        mean: float | None = None
+        if self.is_energy:
+            reading = self._convert(value)
+            if self.complete and reading is not None and self.last_value is not None:
+                delta = reading - self.last_value
+                if delta >= 0:  # counters may reset at midnight
+                    mean = delta * 3600.0 / slot_seconds
+            self.last_value = reading
+            self.last_time = now
+        else:
+            self.update(value, now)
+            if self.complete and self.last_value is not None:
+                mean = self.integral / slot_seconds
+        self.integral = 0.0
+        self.complete = self.last_value is not None
+        return mean
+
+
+def sensor_links(plant: Plant) -> list[SensorLink]:
+    """Create links for all strings and inverters with an actual sensor.
+
+    Rows follow the order used by ``compute_forecast``.
+    """
+    links = [
+        SensorLink("string", s.name, row, s.actual_sensor)
+        for row, s in enumerate(plant.strings)
+        if s.actual_sensor
+    ]
+    links.extend(
+        SensorLink("inverter", inv.name, len(plant.strings) + row, inv.actual_sensor)
+        for row, inv in enumerate(plant.inverters)
+        if inv.actual_sensor
+    )
+    return links
+
+
+class BiasCorrection:
+    """Learn multiplicative forecast bias from linked production sensors.
+
+    Each link keeps two exponentially weighted sums (actual and forecast
+    energy) and their weight, so a new sample costs O(1) and the persistent
+    state is three numbers per link. The correction factor is the ratio of
+    the sums, which weights every slot by its energy.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        coordinator: OpenMeteoPVForecastCoordinator,
+    ) -> None:
+        """Initialize the bias correction."""
+        self.hass = hass
+        self.entry = entry
+        self.coordinator = coordinator
+        self._store: Store[dict[str, list[float]]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}.bias"
+        )
+        self._state: dict[str, list[float]] = {}
+        self._links: list[SensorLink] = []
+        self._unsubscribe: list[CALLBACK_TYPE] = []
+
+    async def async_load(self, plant: Plant) -> None:
+        """Load the learned state, dropping links that no longer exist."""
+        self._state = await self._store.async_load() or {}
+        self.async_set_plant(plant)
+
+    @callback
+    def async_set_plant(self, plant: Plant) -> None:
+        """Link the sensors of the plant, dropping state of removed links."""
+        self._links = sensor_links(plant)
+        self._state = {
+            link.key: self._state[link.key]
+            for link in self._links
+            if link.key in self._state
+        }
+
+    def factor(self, key: str) -> float | None:
+        """Return the learned correction factor for a link, if trusted."""
+        if (state := self._state.get(key)) is None:
+            return None
+        actual, forecast, weight = state
+        if weight < BIAS_MIN_WEIGHT or forecast <= 0:
+            return None
+        return min(max(actual / forecast, BIAS_FACTOR_MIN), BIAS_FACTOR_MAX)
+
+    def string_factors(self, plant: Plant) -> dict[str, float]:
+        """Return correction factors by string name.
+
+        A string with its own sensor uses its own factor; otherwise it uses
+        the factor of its inverter, if that has a sensor.
+        """
+        inverter_factors = {
+            link.name: factor
+            for link in self._links
+            if link.kind == "inverter" and (factor := self.factor(link.key)) is not None
+        }
+        string_factors = {
+            link.name: factor
+            for link in self._links
+            if link.kind == "string" and (factor := self.factor(link.key)) is not None
+        }
+        return {
+            s.name: factor
+            for s in plant.strings
+            if (factor := string_factors.get(s.name, inverter_factors.get(s.inverter)))
+            is not None
+        }
+
+    @callback
+    def async_start(self) -> None:
+        """Start tracking the linked sensors, replacing any previous tracking."""
+        self.async_stop()
+        if not self._links:
+            return
+        now = dt_util.utcnow().timestamp()
+        for link in self._links:
+            link.start(sensor_value(self.hass.states.get(link.entity_id)), now)
+
+        self._unsubscribe = [
+            async_track_state_change_event(
+                self.hass,
+                list({link.entity_id for link in self._links}),
+                self._async_state_changed,
+            ),
+            async_track_utc_time_change(
+                self.hass, self._async_slot_boundary, minute=0, second=0
+            ),
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop tracking the linked sensors."""
+        while self._unsubscribe:
+            self._unsubscribe.pop()()
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Integrate power readings as they arrive."""
+        now = event.time_fired.timestamp()
+        value = sensor_value(event.data.get("new_state"))
+        for link in self._links:
+            if link.entity_id == event.data["entity_id"]:
+                link.update(value, now)
+
+    @callback
+    def _async_slot_boundary(self, now: datetime) -> None:
+        """Close the finished slot and update the estimators."""
+        data = self.coordinator.data
+        timestamp = now.replace(microsecond=0).timestamp()
+        slot_seconds = data.slot_seconds if data is not None else 3600
+        if timestamp % slot_seconds:
+            return
+
+        # A clear-sky fallback says nothing about the bias of the weather model
+        index = (
+            data.slot_index(timestamp - 1)
+            if data is not None and not data.fallback
+            else None
+        )
+        for link in self._links:
+            actual = link.close_slot(
+                sensor_value(self.hass.states.get(link.entity_id)),
+                timestamp,
+                slot_seconds,
+            )
+            if actual is None or index is None:
+                continue
+            forecast = float(data.baseline[link.row, index])
+            if forecast < BIAS_MIN_FORECAST_W:
+                continue
+            self._add_sample(link.key, actual, forecast)
+
+        self._store.async_delay_save(lambda: self._state, SAVE_DELAY)
+
+    def _add_sample(self, key: str, actual: float, forecast: float) -> None:
+        """Fold one slot into the exponentially weighted sums."""
+        state = self._state.setdefault(key, [0.0, 0.0, 0.0])
+        state[0] = BIAS_DECAY * state[0] + actual
+        state[1] = BIAS_DECAY * state[1] + forecast
+        state[2] = BIAS_DECAY * state[2] + 1.0
+        _LOGGER.debug("Bias factor for %s is now %s", key, self.factor(key))
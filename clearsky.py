@@ -0,0 +1,201 @@
+"""Clear-sky irradiance for offline fallback forecasts."""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+
+import numpy as np
+
+from .solar_forecast import solar_position
+
+_LOGGER = logging.getLogger(__name__)
+
+# Monthly Linke turbidity (air mass 2) of rural sites in the northern
+# hemisphere, Jan-Dec, by the highest absolute latitude of each climate zone
+LINKE_TURBIDITY_ZONES = (
+    (23.5, (3.8, 3.9, 4.1, 4.2, 4.3, 4.3, 4.3, 4.3, 4.2, 4.1, 3.9, 3.8)),
+    (35.0, (3.2, 3.4, 3.8, 4.1, 4.4, 4.6, 4.7, 4.6, 4.2, 3.8, 3.4, 3.2)),
+    (55.0, (2.9, 3.1, 3.5, 3.9, 4.1, 4.3, 4.4, 4.3, 3.9, 3.5, 3.1, 2.9)),
+    (90.0, (2.3, 2.5, 2.8, 3.1, 3.3, 3.4, 3.5, 3.4, 3.1, 2.8, 2.5, 2.3)),
+)
+SOLAR_CONSTANT = 1367.0  # W/m²
+TABLE_VERSION = 2
+# Reference leap year used to lay out the day axis, so every calendar day
+# including 29 February has its own row
+REFERENCE_YEAR_START = 1704067200  # 2024-01-01T00:00:00Z
+DAYS = 366
+# Row of the first day of each month on the day axis
+MONTH_STARTS = np.cumsum((0, 31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30))
+# Bounds of the clear-sky index carried over into fallback forecasts
+CLEAR_SKY_INDEX_MIN = 0.0
+CLEAR_SKY_INDEX_MAX = 1.2
+
+
+def monthly_linke_turbidity(latitude: float) -> tuple[float, ...]:
+    """Return the monthly Linke turbidity for a site, Jan-Dec.
+
+    The climate zone is picked by absolute latitude. South of the equator
+    the seasonal profile is shifted by six months.
+    """
+    monthly = next(
+        profile for limit, profile in LINKE_TURBIDITY_ZONES if abs(latitude) <= limit
+    )
+    if latitude < 0:
+        return monthly[6:] + monthly[:6]
+    return monthly
+
+
+def daily_linke_turbidity(monthly: tuple[float, ...]) -> np.ndarray:
+    """Interpolate monthly Linke turbidity to every day of the year.
+
+    Monthly values are placed at mid-month and wrap around the year end.
+    """
+    mid_month = (np.arange(12) + 0.5) * DAYS / 12
+    return np.interp(np.arange(DAYS) + 0.5, mid_month, monthly, period=DAYS)
+
+
+def ineichen(
+    timestamps: np.ndarray,
+    latitude: float,
+    longitude: float,
+    altitude: float,
+    linke_turbidity: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return clear-sky GHI and DHI in W/m² using the Ineichen-Perez model."""
+    elevation, _ = solar_position(timestamps, latitude, longitude)
+    zenith = 90.0 - elevation
+    cos_zenith = np.clip(np.cos(np.radians(zenith)), 0, None)
+    daylight = elevation > 0
+
+    # Kasten-Young relative air mass, corrected for site pressure
+    relative_airmass = np.where(
+        daylight,
+        1 / (cos_zenith + 0.50572 * np.clip(96.07995 - zenith, 1e-3, None) ** -1.6364),
+        np.nan,
+    )
+    pressure_ratio = (1 - 2.25577e-5 * altitude) ** 5.25588
+    airmass = relative_airmass * pressure_ratio
+
+    day_angle = 2 * np.pi * (timestamps / 86400.0 % 365.25) / 365.25
+    dni_extra = SOLAR_CONSTANT * (1 + 0.033 * np.cos(day_angle))
+
+    fh1 = np.exp(-altitude / 8000)
+    fh2 = np.exp(-altitude / 1250)
+    cg1 = 5.09e-5 * altitude + 0.868
+    cg2 = 3.92e-5 * altitude + 0.0387
+
+    ghi = cg1 * dni_extra * cos_zenith * np.exp(
+        -cg2 * airmass * (fh1 + fh2 * (linke_turbidity - 1))
+    )
+    ghi = np.where(daylight, ghi, 0.0)
+
+    b = 0.664 + 0.163 / fh1
+    dni = dni_extra * b * np.exp(-0.09 * airmass * (linke_turbidity - 1))
+    dni_limit = ghi * (
+        1 - (0.1 - 0.2 * np.exp(-linke_turbidity)) / (0.1 + 0.882 / fh1)
+    ) / np.maximum(cos_zenith, 1e-3)
+    dni = np.where(daylight, np.minimum(dni, dni_limit), 0.0)
+    dhi = np.clip(ghi - dni * cos_zenith, 0, None)
+    return ghi, dhi
+
+
+def build_table(
+    latitude: float, longitude: float, altitude: float, slot_seconds: int
+) -> np.ndarray:
+    """Precompute clear-sky slot means for every day of the year.
+
+    Values are evaluated at the slot centre. Result shape is
+    (2, days, slots per day) with GHI first and DHI second; days are the
+    calendar days of a leap year.
+    """
+    slots = 86400 // slot_seconds
+    days = np.arange(DAYS)[:, np.newaxis]
+    centres = (
+        REFERENCE_YEAR_START
+        + days * 86400.0
+        + (np.arange(slots)[np.newaxis, :] + 0.5) * slot_seconds
+    )
+    turbidity = daily_linke_turbidity(monthly_linke_turbidity(latitude))
+    turbidity = turbidity[:, np.newaxis]
+    turbidity = np.broadcast_to(turbidity, centres.shape)
+    ghi, dhi = ineichen(centres, latitude, longitude, altitude, turbidity)
+    return np.stack((ghi, dhi)).astype(np.float32)
+
+
+class ClearSkyTable:
+    """Site clear-sky lookup backed by a memory-mapped table file."""
+
+    def __init__(self, table: np.ndarray, slot_seconds: int) -> None:
+        """Initialize the lookup."""
+        self._table = table
+        self.slot_seconds = slot_seconds
+
+    @classmethod
+    def load(
+        cls,
+        directory: Path,
+        latitude: float,
+        longitude: float,
+        altitude: float,
+        slot_seconds: int,
+    ) -> ClearSkyTable:
+        """Open the table for this site, building it on first use."""
+        path = directory / (
+            f"clearsky_v{TABLE_VERSION}_{latitude:.3f}_{longitude:.3f}"
+            f"_{altitude:.0f}_{slot_seconds}.npy"
+        )
+        if not path.exists():
+            _LOGGER.debug("Building clear-sky table %s", path)
+            directory.mkdir(parents=True, exist_ok=True)
+            np.save(path, build_table(latitude, longitude, altitude, slot_seconds))
+        return cls(np.load(path, mmap_mode="r"), slot_seconds)
+
+    def lookup(self, timestamps: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return clear-sky GHI and DHI for slots ending at ``timestamps``.
+
+        Slots are matched by month and day, so outside leap years the row of
+        29 February is skipped instead of shifting the rest of the year.
+        """
+        starts = (np.asarray(timestamps) - self.slot_seconds).astype("datetime64[s]")
+        midnight = starts.astype("datetime64[D]")
+        month = starts.astype("datetime64[M]")
+        day = MONTH_STARTS[month.astype(np.intp) % 12] + (
+            midnight - month.astype("datetime64[D]")
+        ).astype(np.intp)
+        slot = (starts - midnight).astype(np.intp) // self.slot_seconds
+        values = self._table[:, day, slot]
+        return values[0].astype(float), values[1].astype(float)
+
+    def clear_sky_index(self, times: np.ndarray, ghi: np.ndarray) -> float | None:
+        """Return the clear-sky index of the member mean over the first day."""
+        if not len(times):
+            return None
+        first_day = times < times[0] + 86400
+        clear_ghi, _ = self.lookup(times[first_day])
+        if (clear_total := clear_ghi.sum()) <= 0:
+            return None
+        measured = np.nan_to_num(ghi[:, first_day]).mean(axis=0).sum()
+        return float(
+            np.clip(measured / clear_total, CLEAR_SKY_INDEX_MIN, CLEAR_SKY_INDEX_MAX)
+        )
+
+    def fallback_inputs(
+        self, now: float, slots: int, clear_sky_index: float | None
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return model inputs for a single clear-sky member starting at ``now``.
+
+        Irradiance is scaled by ``clear_sky_index`` if given; the air
+        temperature is unknown and left as NaN.
+        """
+        times = (now // self.slot_seconds + 1 + np.arange(slots)) * self.slot_seconds
+        ghi, dhi = self.lookup(times)
+        if clear_sky_index is not None:
+            ghi = ghi * clear_sky_index
+            dhi = dhi * clear_sky_index
+        return (
+            times,
+            ghi[np.newaxis],
+            dhi[np.newaxis],
+            np.full((1, len(times)), np.nan),
+        )
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Mapping
 from dataclasses import dataclass
 from typing import Any
 
@@ -14,12 +15,22 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
 
 from .const import (
+    CONF_ACTUAL_SENSOR,
+    CONF_ARCHIVE_DAYS,
+    CONF_COMPACT,
+    CONF_DEADBAND,
     CONF_HORIZON,
+    CONF_QUANTILES,
     CONF_VERSION,
     CONF_WEATHER_MODEL,
+    DEFAULT_ARCHIVE_DAYS,
+    DEFAULT_COMPACT,
+    DEFAULT_DEADBAND,
     DEFAULT_HORIZON,
+    DEFAULT_QUANTILES,
     DEFAULT_WEATHER_MODEL,
     DOMAIN,
+    QUANTILE_OPTIONS,
     WEATHER_MODELS,
 )
 
@@ -29,28 +40,82 @@ CONF_INVERTER = "inverter"
 CONF_STRING_NAME = "string_name"
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Inverter:
     """Inverter configuration class."""
 
     name: str
-    size_w: int
-    max_ac_w: int | None = None
+    size_w: float
+    max_ac_w: float | None = None
     inverter_eff: float = 0.98
+    actual_sensor: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> Inverter:
+        """Create an inverter from its stored options."""
+        return cls(
+            name=data["name"],
+            size_w=float(data["size_w"]),
+            max_ac_w=float(max_ac) if (max_ac := data.get("max_ac_w")) else None,
+            inverter_eff=float(data.get("inverter_eff", 0.98)),
+            actual_sensor=data.get(CONF_ACTUAL_SENSOR),
+        )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class PVString:
     """PV string configuration class."""
 
     name: str
     inverter: str
-    azimuth: int
-    tilt: int
-    power_w: int
-    horizon: list[float]  # Add horizon field
+    azimuth: float
+    tilt: float
+    power_w: float
+    horizon: tuple[float, ...]
     albedo: float = 0.2
     cell_coeff: float = 0.0328
+    actual_sensor: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> PVString:
+        """Create a PV string from its stored options."""
+        return cls(
+            name=data[CONF_STRING_NAME],
+            inverter=data[CONF_INVERTER],
+            azimuth=float(data["azimuth"]),
+            tilt=float(data["tilt"]),
+            power_w=float(data["power_w"]),
+            horizon=tuple(map(float, data.get(CONF_HORIZON, DEFAULT_HORIZON))),
+            albedo=float(data.get("albedo", 0.2)),
+            cell_coeff=float(data.get("cell_coeff", 0.0328)),
+            actual_sensor=data.get(CONF_ACTUAL_SENSOR),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Plant:
+    """Compiled plant configuration.
+
+    Only strings attached to a configured inverter are kept. Their order,
+    followed by the inverters, defines the rows of the forecast arrays.
+    """
+
+    inverters: tuple[Inverter, ...]
+    strings: tuple[PVString, ...]
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> Plant:
+        """Compile the plant from the config entry options."""
+        inverters = tuple(
+            Inverter.from_dict(inv) for inv in options.get(CONF_INVERTERS, [])
+        )
+        names = {inv.name for inv in inverters}
+        strings = tuple(
+            string
+            for string in map(PVString.from_dict, options.get(CONF_STRINGS, []))
+            if string.inverter in names
+        )
+        return cls(inverters=inverters, strings=strings)
 
 
 def inverter_schema(existing_names: set[str] | None = None) -> vol.Schema:
@@ -82,6 +147,11 @@ def inverter_schema(existing_names: set[str] | None = None) -> vol.Schema:
                     mode=selector.NumberSelectorMode.BOX,
                 ),
             ),
+            vol.Optional(CONF_ACTUAL_SENSOR): selector.EntitySelector(
+                selector.EntitySelectorConfig(
+                    domain="sensor", device_class=["power", "energy"]
+                ),
+            ),
         }
     )
 
@@ -157,6 +227,11 @@ def string_schema(
                     mode=selector.NumberSelectorMode.BOX,
                 ),
             ),
+            vol.Optional(CONF_ACTUAL_SENSOR): selector.EntitySelector(
+                selector.EntitySelectorConfig(
+                    domain="sensor", device_class=["power", "energy"]
+                ),
+            ),
         }
     )
 
@@ -217,6 +292,68 @@ def weather_model_schema(unit_system: str = UnitOfLength.KILOMETERS) -> vol.Sche
     )
 
 
+def quantile_schema(current_values: list[float] | None = None) -> vol.Schema:
+    """Get schema for ensemble quantile selection."""
+    if current_values is None:
+        current_values = DEFAULT_QUANTILES
+
+    return vol.Schema(
+        {
+            vol.Required(
+                CONF_QUANTILES, default=[f"{q:g}" for q in current_values]
+            ): selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[
+                        selector.SelectOptionDict(value=f"{q:g}", label=f"P{q:g}")
+                        for q in QUANTILE_OPTIONS
+                    ],
+                    multiple=True,
+                    mode=selector.SelectSelectorMode.LIST,
+                )
+            ),
+        }
+    )
+
+
+def deadband_schema(current_value: float = DEFAULT_DEADBAND) -> vol.Schema:
+    """Get schema for the sensor write deadband."""
+    return vol.Schema(
+        {
+            vol.Required(CONF_DEADBAND, default=current_value): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=1000,
+                    step=1,
+                    unit_of_measurement="W / Wh",
+                    mode=selector.NumberSelectorMode.BOX,
+                ),
+            ),
+        }
+    )
+
+
+def memory_schema(
+    compact: bool = DEFAULT_COMPACT, archive_days: int = DEFAULT_ARCHIVE_DAYS
+) -> vol.Schema:
+    """Get schema for the memory and storage options."""
+    return vol.Schema(
+        {
+            vol.Required(CONF_COMPACT, default=compact): selector.BooleanSelector(),
+            vol.Required(
+                CONF_ARCHIVE_DAYS, default=archive_days
+            ): selector.NumberSelector(
+                selector.NumberSelectorConfig(
+                    min=0,
+                    max=3650,
+                    step=1,
+                    unit_of_measurement="d",
+                    mode=selector.NumberSelectorMode.BOX,
+                ),
+            ),
+        }
+    )
+
+
 class OpenMeteoPVForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle config flow for Open-Meteo PV Forecast."""
 
@@ -241,6 +378,10 @@ class OpenMeteoPVForecastConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         CONF_WEATHER_MODEL: self._weather_model,
                         CONF_INVERTERS: self._inverters,
                         CONF_STRINGS: self._strings,
+                        CONF_QUANTILES: DEFAULT_QUANTILES,
+                        CONF_DEADBAND: DEFAULT_DEADBAND,
+                        CONF_COMPACT: DEFAULT_COMPACT,
+                        CONF_ARCHIVE_DAYS: DEFAULT_ARCHIVE_DAYS,
                     },
                 )
             return await self.async_step(user_input["next_step_id"])
@@ -349,9 +490,25 @@ class OpenMeteoPVForecastOptionsFlow(config_entries.OptionsFlow):
 
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         """Initialize options flow."""
-        self.inverters = list(config_entry.options.get(CONF_INVERTERS, []))
-        self.strings = list(config_entry.options.get(CONF_STRINGS, []))
-        self.weather_model = config_entry.options.get(CONF_WEATHER_MODEL)
+        self.options = dict(config_entry.options)
+        self.inverters = list(self.options.get(CONF_INVERTERS, []))
+        self.strings = list(self.options.get(CONF_STRINGS, []))
+
+    @callback
+    def _async_save_options(self, changes: dict[str, Any] | None = None) -> FlowResult:
+        """Save the plant edited in this flow and ``changes``.
+
+        All other options are kept as stored in the entry.
+        """
+        return self.async_create_entry(
+            title="",
+            data={
+                **self.options,
+                CONF_INVERTERS: self.inverters,
+                CONF_STRINGS: self.strings,
+                **(changes or {}),
+            },
+        )
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
@@ -359,13 +516,7 @@ class OpenMeteoPVForecastOptionsFlow(config_entries.OptionsFlow):
         """Handle options flow."""
         if user_input is not None:
             if user_input["menu_option"] == "done":
-                return self.async_create_entry(
-                    title="",
-                    data={
-                        CONF_INVERTERS: self.inverters,
-                        CONF_STRINGS: self.strings,
-                    },
-                )
+                return self._async_save_options()
             return await self.async_step(user_input["menu_option"])
 
         return self.async_show_menu(
@@ -373,6 +524,9 @@ class OpenMeteoPVForecastOptionsFlow(config_entries.OptionsFlow):
             menu_options=[
                 "edit_inverters",
                 "edit_strings",
+                "edit_quantiles",
+                "edit_deadband",
+                "edit_memory",
                 "done",
             ],  # Remove edit_horizon
         )
@@ -423,6 +577,7 @@ class OpenMeteoPVForecastOptionsFlow(config_entries.OptionsFlow):
                 "size_w": user_input["size_w"],
                 "max_ac_w": user_input.get("max_ac_w"),  # Optional field
                 "inverter_eff": user_input["inverter_eff"],
+                CONF_ACTUAL_SENSOR: user_input.get(CONF_ACTUAL_SENSOR),
             }
             # Replace old inverter with updated one
             self.inverters = [
@@ -467,6 +622,16 @@ class OpenMeteoPVForecastOptionsFlow(config_entries.OptionsFlow):
                             mode=selector.NumberSelectorMode.BOX,
                         ),
                     ),
+                    vol.Optional(
+                        CONF_ACTUAL_SENSOR,
+                        description={
+                            "suggested_value": inverter.get(CONF_ACTUAL_SENSOR)
+                        },
+                    ): selector.EntitySelector(
+                        selector.EntitySelectorConfig(
+                            domain="sensor", device_class=["power", "energy"]
+                        ),
+                    ),
                 }
             ),
             description_placeholders={
@@ -497,13 +662,7 @@ class OpenMeteoPVForecastOptionsFlow(config_entries.OptionsFlow):
                     for s in self.strings
                     if s[CONF_STRING_NAME] != user_input["string"]
                 ]
-            return self.async_create_entry(
-                title="",
-                data={
-                    CONF_INVERTERS: self.inverters,
-                    CONF_STRINGS: self.strings,
-                },
-            )
+            return self._async_save_options()
 
         if not self.strings:
             return await self.async_step_add_string()
@@ -532,6 +691,58 @@ class OpenMeteoPVForecastOptionsFlow(config_entries.OptionsFlow):
             ),
         )
 
+    async def async_step_edit_quantiles(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Edit the ensemble quantiles exposed by the sensors."""
+        if user_input is not None:
+            return self._async_save_options(
+                {CONF_QUANTILES: sorted(float(q) for q in user_input[CONF_QUANTILES])}
+            )
+
+        return self.async_show_form(
+            step_id="edit_quantiles",
+            data_schema=quantile_schema(
+                self.options.get(CONF_QUANTILES, DEFAULT_QUANTILES)
+            ),
+        )
+
+    async def async_step_edit_deadband(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Edit the minimum change that triggers a sensor state write."""
+        if user_input is not None:
+            return self._async_save_options(
+                {CONF_DEADBAND: float(user_input[CONF_DEADBAND])}
+            )
+
+        return self.async_show_form(
+            step_id="edit_deadband",
+            data_schema=deadband_schema(
+                self.options.get(CONF_DEADBAND, DEFAULT_DEADBAND)
+            ),
+        )
+
+    async def async_step_edit_memory(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Edit the memory use of the model and the forecast archive."""
+        if user_input is not None:
+            return self._async_save_options(
+                {
+                    CONF_COMPACT: bool(user_input[CONF_COMPACT]),
+                    CONF_ARCHIVE_DAYS: int(user_input[CONF_ARCHIVE_DAYS]),
+                }
+            )
+
+        return self.async_show_form(
+            step_id="edit_memory",
+            data_schema=memory_schema(
+                self.options.get(CONF_COMPACT, DEFAULT_COMPACT),
+                self.options.get(CONF_ARCHIVE_DAYS, DEFAULT_ARCHIVE_DAYS),
+            ),
+        )
+
     async def async_step_edit_horizon(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
@@ -539,14 +750,7 @@ class OpenMeteoPVForecastOptionsFlow(config_entries.OptionsFlow):
         if user_input is not None:
             # Convert form data to horizon list
             self.horizon = [user_input[f"horizon_{i}"] for i in range(12)]
-            return self.async_create_entry(
-                title="",
-                data={
-                    CONF_INVERTERS: self.inverters,
-                    CONF_STRINGS: self.strings,
-                    CONF_HORIZON: self.horizon,
-                },
-            )
+            return self._async_save_options({CONF_HORIZON: self.horizon})
 
         return self.async_show_form(
             step_id="edit_horizon",
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+from collections.abc import Sequence
 from dataclasses import dataclass
 from datetime import timedelta
+import math
 from typing import Final
 
 from homeassistant.const import UnitOfLength
@@ -18,6 +20,8 @@ SENSOR_TYPE_STRING_FORECAST: Final = "string_forecast"
 SENSOR_TYPE_INVERTER_FORECAST: Final = "inverter_forecast"
 SENSOR_TYPE_STRING_REMAINING: Final = "string_remaining"
 SENSOR_TYPE_INVERTER_REMAINING: Final = "inverter_remaining"
+SENSOR_TYPE_POWER: Final = "power"
+SENSOR_TYPE_ENERGY_REMAINING: Final = "energy_remaining"
 
 # Horizon configuration
 CONF_HORIZON: Final = "horizon"
@@ -43,12 +47,47 @@ HORIZON_STEP: Final = 0.5  # degrees
 CONF_WEATHER_MODEL: Final = "weather_model"
 DEFAULT_WEATHER_MODEL: Final = "icon_d2_eps"
 
+# Bias correction from actual production sensors
+CONF_ACTUAL_SENSOR: Final = "actual_sensor"
+
+# Ensemble statistics configuration
+CONF_QUANTILES: Final = "quantiles"
+DEFAULT_QUANTILES: Final = [10, 25, 75, 90]  # percentiles
+QUANTILE_OPTIONS: Final = [5, 10, 25, 75, 90, 95]  # percentiles
+STAT_MIN: Final = "min"
+STAT_MEDIAN: Final = "median"
+STAT_MAX: Final = "max"
+
+# Sensor state writes
+CONF_DEADBAND: Final = "deadband"
+DEFAULT_DEADBAND: Final = 10.0  # W or Wh
+
+# Memory use
+CONF_COMPACT: Final = "compact"
+DEFAULT_COMPACT: Final = False
+
+# Forecast archive
+CONF_ARCHIVE_DAYS: Final = "archive_days"
+DEFAULT_ARCHIVE_DAYS: Final = 90  # 0 disables the archive
+
+# Dispatcher signal sent with the entry id after options were applied
+SIGNAL_OPTIONS_UPDATED: Final = f"{DOMAIN}_options_updated"
+
+# Services
+SERVICE_BACKTEST: Final = "backtest"
+SERVICE_EXPORT_PLANT: Final = "export_plant"
+SERVICE_IMPORT_PLANT: Final = "import_plant"
+
+# Open-Meteo ensemble API
+ENSEMBLE_API_URL: Final = "https://ensemble-api.open-meteo.com/v1/ensemble"
+
 
 @dataclass
 class WeatherModel:
     """Weather model configuration class."""
 
     id: str
+    api_id: str  # model name used by the Open-Meteo ensemble API
     name: str
     region: str
     resolution_km: float
@@ -69,6 +108,11 @@ class WeatherModel:
         )
         return f"{miles:.0f} mi"
 
+    @property
+    def forecast_days(self) -> int:
+        """Whole days to request from the API to cover the model horizon."""
+        return math.ceil(float(self.forecast_length.split()[0]))
+
     def get_resolution(self, to_unit: str) -> str:
         """Get full resolution string including time interval."""
         dist = self.get_resolution_string(to_unit)
@@ -78,6 +122,7 @@ class WeatherModel:
 WEATHER_MODELS: dict[str, WeatherModel] = {
     "icon_d2_eps": WeatherModel(
         id="icon_d2_eps",
+        api_id="icon_d2",
         name="ICON-D2-EPS (DWD)",
         region="Central Europe",
         resolution_km=2,
@@ -90,6 +135,7 @@ WEATHER_MODELS: dict[str, WeatherModel] = {
     ),
     "icon_eu_eps": WeatherModel(
         id="icon_eu_eps",
+        api_id="icon_eu",
         name="ICON-EU-EPS (DWD)",
         region="Europe",
         resolution_km=13,
@@ -102,6 +148,7 @@ WEATHER_MODELS: dict[str, WeatherModel] = {
     ),
     "icon_eps": WeatherModel(
         id="icon_eps",
+        api_id="icon_global",
         name="ICON-EPS (DWD)",
         region="Global",
         resolution_km=26,
@@ -114,6 +161,7 @@ WEATHER_MODELS: dict[str, WeatherModel] = {
     ),
     "mogreps_uk": WeatherModel(
         id="mogreps_uk",
+        api_id="ukmo_uk_ensemble_2km",
         name="MOGREPS-UK (UK Met Office)",
         region="UK",
         resolution_km=2,
@@ -126,6 +174,7 @@ WEATHER_MODELS: dict[str, WeatherModel] = {
     ),
     "mogreps_g": WeatherModel(
         id="mogreps_g",
+        api_id="ukmo_global_ensemble_20km",
         name="MOGREPS-G (UK Met Office)",
         region="Global",
         resolution_km=20,
@@ -137,3 +186,8 @@ WEATHER_MODELS: dict[str, WeatherModel] = {
         next_update_interval=timedelta(hours=6),
     ),
 }
+
+
+def statistic_keys(quantiles: Sequence[float]) -> list[str]:
+    """Return the statistic names for the given quantiles."""
+    return [STAT_MIN, STAT_MEDIAN, STAT_MAX, *(f"p{q:g}" for q in quantiles)]
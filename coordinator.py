@@ -0,0 +1,327 @@
+"""Data update coordinator for Open-Meteo PV Forecast."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from datetime import timedelta
+from importlib import import_module
+import logging
+from pathlib import Path
+import time
+from types import ModuleType
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+from homeassistant.util.json import json_loads
+
+from .bias import BiasCorrection
+from .config_flow import Plant
+from .const import (
+    CONF_ARCHIVE_DAYS,
+    CONF_COMPACT,
+    CONF_QUANTILES,
+    CONF_WEATHER_MODEL,
+    DEFAULT_ARCHIVE_DAYS,
+    DEFAULT_COMPACT,
+    DEFAULT_QUANTILES,
+    DEFAULT_WEATHER_MODEL,
+    DOMAIN,
+    ENSEMBLE_API_URL,
+    WEATHER_MODELS,
+    WeatherModel,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .archive import ForecastArchive
+    from .clearsky import ClearSkyTable
+    from .solar_forecast import ForecastData, WorkBuffers
+
+_LOGGER = logging.getLogger(__name__)
+
+HOURLY_VARIABLES = ("shortwave_radiation", "diffuse_radiation", "temperature_2m")
+
+
+async def async_fetch_ensemble(
+    hass: HomeAssistant, weather_model: WeatherModel, **params: Any
+) -> dict[str, Any]:
+    """Fetch hourly ensemble data for the home location from Open-Meteo."""
+    session = async_get_clientsession(hass)
+    params = {
+        "latitude": hass.config.latitude,
+        "longitude": hass.config.longitude,
+        "hourly": ",".join(HOURLY_VARIABLES),
+        "models": weather_model.api_id,
+        "timeformat": "unixtime",
+        **params,
+    }
+    async with session.get(
+        ENSEMBLE_API_URL, params=params, timeout=aiohttp.ClientTimeout(total=30)
+    ) as response:
+        response.raise_for_status()
+        return (await response.json(loads=json_loads))["hourly"]
+
+
+class OpenMeteoPVForecastCoordinator(DataUpdateCoordinator["ForecastData"]):
+    """Fetch the ensemble forecast and compute PV statistics."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the coordinator."""
+        self.entry = entry
+        self.plant = Plant.from_options(entry.options)
+        self.compact = bool(entry.options.get(CONF_COMPACT, DEFAULT_COMPACT))
+        self.weather_model = WEATHER_MODELS[
+            entry.options.get(CONF_WEATHER_MODEL) or DEFAULT_WEATHER_MODEL
+        ]
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=self.weather_model.next_update_interval,
+        )
+        self.bias = BiasCorrection(hass, entry, self)
+        self.clear_sky: ClearSkyTable | None = None
+        self.clear_sky_index: float | None = None
+        self.archive: ForecastArchive | None = None
+        self._model: ModuleType | None = None
+        self._archive_module: ModuleType | None = None
+        self._buffers: WorkBuffers | None = None
+        # Model inputs of the last forecast and whether they are clear-sky
+        # fallback inputs, to recompute it after option changes
+        self._inputs: tuple[np.ndarray, ...] | None = None
+        self._fallback = False
+        self._started = False
+        # Model runs share the work buffers and must not overlap
+        self._compute_lock = asyncio.Lock()
+
+    async def async_start(self) -> None:
+        """Load the learned bias and compute the first forecast."""
+        self._started = True
+        await self.bias.async_load(self.plant)
+        self.bias.async_start()
+        self.entry.async_on_unload(self.bias.async_stop)
+        await self.async_refresh()
+
+    async def async_apply_options(self) -> bool:
+        """Apply changed options without reloading the entry.
+
+        The plant is recompiled, the bias links follow it and the last
+        forecast is recomputed from its stored inputs, without a new fetch.
+        Returns False if the weather model changed, which needs a reload.
+        """
+        options = self.entry.options
+        model_id = options.get(CONF_WEATHER_MODEL) or DEFAULT_WEATHER_MODEL
+        if model_id != self.weather_model.id:
+            return False
+        self.plant = Plant.from_options(options)
+        self.compact = bool(options.get(CONF_COMPACT, DEFAULT_COMPACT))
+        if not self._started:
+            return True
+        self.bias.async_set_plant(self.plant)
+        self.bias.async_start()
+        if self._inputs is not None:
+            async with self._compute_lock:
+                data = await self._async_compute(self._inputs, self._fallback)
+            self.async_set_updated_data(data)
+        return True
+
+    @property
+    def slot_seconds(self) -> int:
+        """Length of a forecast slot in seconds."""
+        return self.weather_model.resolution_hours * 3600
+
+    async def _async_load_model(self) -> None:
+        """Import the numeric model and open the clear-sky table on first use.
+
+        NumPy and the model code are only imported here, in the executor, so
+        they add nothing to integration setup.
+        """
+        start = time.perf_counter()
+        model = await self.hass.async_add_import_executor_job(
+            import_module, f"{__package__}.solar_forecast"
+        )
+        clearsky = await self.hass.async_add_import_executor_job(
+            import_module, f"{__package__}.clearsky"
+        )
+        self._archive_module = await self.hass.async_add_import_executor_job(
+            import_module, f"{__package__}.archive"
+        )
+        self.clear_sky = await self.hass.async_add_executor_job(
+            clearsky.ClearSkyTable.load,
+            Path(self.hass.config.path(STORAGE_DIR, DOMAIN)),
+            self.hass.config.latitude,
+            self.hass.config.longitude,
+            float(self.hass.config.elevation),
+            self.slot_seconds,
+        )
+        self._buffers = model.WorkBuffers()
+        self._model = model
+        _LOGGER.debug(
+            "Loaded forecast model in %.1f ms", (time.perf_counter() - start) * 1000
+        )
+
+    async def _async_update_data(self) -> ForecastData:
+        """Fetch new ensemble data and compute the forecast.
+
+        If Open-Meteo is unreachable, the previous forecast is kept while it
+        still covers the current slot; otherwise a clear-sky forecast scaled
+        by the last known clear-sky index is computed without network access.
+        """
+        if self._model is None:
+            await self._async_load_model()
+
+        try:
+            hourly = await async_fetch_ensemble(
+                self.hass,
+                self.weather_model,
+                forecast_days=self.weather_model.forecast_days,
+            )
+        except (aiohttp.ClientError, TimeoutError, KeyError) as err:
+            now = dt_util.utcnow().timestamp()
+            if self.data is not None and self.data.slot_index(now) is not None:
+                raise UpdateFailed(
+                    f"Error fetching Open-Meteo ensemble: {err}"
+                ) from err
+            _LOGGER.warning(
+                "Error fetching Open-Meteo ensemble, using clear-sky forecast: %s",
+                err,
+            )
+            async with self._compute_lock:
+                inputs = await self.hass.async_add_executor_job(
+                    self._fallback_inputs, now
+                )
+                data = await self._async_compute(inputs, fallback=True)
+            self._inputs = inputs
+            self._fallback = True
+            return data
+
+        issued = dt_util.utcnow().timestamp()
+        async with self._compute_lock:
+            inputs = await self.hass.async_add_executor_job(
+                self._ensemble_inputs, hourly
+            )
+            data = await self._async_compute(inputs)
+            await self.hass.async_add_executor_job(self._archive_forecast, data, issued)
+        self._inputs = inputs
+        self._fallback = False
+        return data
+
+    async def _async_compute(
+        self, inputs: tuple[np.ndarray, ...], fallback: bool = False
+    ) -> ForecastData:
+        """Run the model block by block and publish the near term early.
+
+        As soon as the computed part reaches the next local midnight, it is
+        handed to the sensors, so today's values update before the rest of
+        the horizon is done. Each block runs as its own executor job.
+        Raises UpdateFailed if the inputs have no slots.
+        """
+        blocks = self._model_blocks(*inputs, fallback=fallback)
+        midnight = dt_util.start_of_local_day(
+            dt_util.now() + timedelta(days=1)
+        ).timestamp()
+        slots = len(inputs[0])
+        published = False
+        data: ForecastData | None = None
+        while (
+            block := await self.hass.async_add_executor_job(next, blocks, None)
+        ) is not None:
+            data = block
+            if (
+                not published
+                and len(data.times) < slots
+                and data.times[-1] >= midnight
+            ):
+                self.data = data
+                self.async_update_listeners()
+                published = True
+        if data is None:
+            raise UpdateFailed("Open-Meteo returned no forecast slots")
+        return data
+
+    def _ensemble_inputs(self, hourly: dict[str, Any]) -> tuple[np.ndarray, ...]:
+        """Return model inputs from an API response and track the sky index."""
+        assert self._model is not None and self.clear_sky is not None
+        times, ghi, dhi, temp_air = self._model.ensemble_inputs(hourly)
+        self.clear_sky_index = self.clear_sky.clear_sky_index(times, ghi)
+        return times, ghi, dhi, temp_air
+
+    @property
+    def archive_path(self) -> Path:
+        """Path of the forecast archive of this entry."""
+        return Path(
+            self.hass.config.path(
+                STORAGE_DIR, DOMAIN, f"archive_{self.entry.entry_id}.npy"
+            )
+        )
+
+    def _archive_forecast(self, data: ForecastData, issued: float) -> None:
+        """Append a model run to the forecast archive, if enabled.
+
+        The archive is reopened when the retention or the record layout
+        (plant, quantiles, horizon) changed.
+        """
+        assert self._archive_module is not None
+        days = self.entry.options.get(CONF_ARCHIVE_DAYS, DEFAULT_ARCHIVE_DAYS)
+        if not days:
+            self.archive = None
+            return
+        interval = int(self.weather_model.next_update_interval.total_seconds())
+        slots = self.weather_model.forecast_days * 86400 // self.slot_seconds
+        layout = self._archive_module.archive_layout(data, slots, interval)
+        capacity = max(1, int(days * 86400 // interval))
+        try:
+            if (
+                self.archive is None
+                or self.archive.layout != layout
+                or self.archive.capacity != capacity
+            ):
+                self.archive = None
+                self.archive = self._archive_module.ForecastArchive.open(
+                    self.archive_path, layout, capacity
+                )
+            self.archive.append(issued, data)
+        except OSError as err:
+            _LOGGER.warning("Error writing forecast archive: %s", err)
+
+    def _fallback_inputs(self, now: float) -> tuple[np.ndarray, ...]:
+        """Return clear-sky model inputs for the model horizon."""
+        assert self.clear_sky is not None
+        slots = self.weather_model.forecast_days * 86400 // self.slot_seconds
+        return self.clear_sky.fallback_inputs(now, slots, self.clear_sky_index)
+
+    def _model_blocks(
+        self,
+        times: np.ndarray,
+        ghi: np.ndarray,
+        dhi: np.ndarray,
+        temp_air: np.ndarray,
+        fallback: bool = False,
+    ) -> Iterator[ForecastData]:
+        """Return the block-wise forecast for the configured plant."""
+        assert self._model is not None
+        return self._model.iter_forecast(
+            times,
+            ghi,
+            dhi,
+            temp_air,
+            self.hass.config.latitude,
+            self.hass.config.longitude,
+            self.plant,
+            self.entry.options.get(CONF_QUANTILES, DEFAULT_QUANTILES),
+            slot_seconds=self.slot_seconds,
+            string_factors=self.bias.string_factors(self.plant),
+            compact=self.compact,
+            buffers=self._buffers,
+            tz=dt_util.DEFAULT_TIME_ZONE,
+            fallback=fallback,
+        )
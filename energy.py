@@ -0,0 +1,21 @@
+"""Energy platform for Open-Meteo PV Forecast."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_solar_forecast(
+    hass: HomeAssistant, config_entry_id: str
+) -> dict[str, dict[str, float]] | None:
+    """Get the solar forecast for the Energy dashboard.
+
+    Returns the hourly buckets precomputed with each model run.
+    """
+    if (coordinator := hass.data.get(DOMAIN, {}).get(config_entry_id)) is None:
+        return None
+    if coordinator.data is None:
+        return None
+    return {"wh_hours": coordinator.data.wh_hours}
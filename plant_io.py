@@ -0,0 +1,201 @@
+"""Bulk import and export of the plant description."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.yaml import dump, parse_yaml
+
+from .config_flow import (
+    CONF_INVERTER,
+    CONF_INVERTERS,
+    CONF_STRING_NAME,
+    CONF_STRINGS,
+    inverter_schema,
+    string_schema,
+)
+from .const import CONF_ACTUAL_SENSOR, CONF_HORIZON
+
+FORMAT_YAML = "yaml"
+FORMAT_JSON = "json"
+FORMAT_CSV = "csv"
+FORMATS = [FORMAT_YAML, FORMAT_JSON, FORMAT_CSV]
+
+# One CSV row per inverter or string, told apart by the type column
+CSV_TYPE = "type"
+CSV_FIELDS = [
+    CSV_TYPE,
+    "name",
+    CONF_INVERTER,
+    "size_w",
+    "max_ac_w",
+    "inverter_eff",
+    "azimuth",
+    "tilt",
+    "power_w",
+    "albedo",
+    "cell_coeff",
+    CONF_ACTUAL_SENSOR,
+    *(f"horizon_{i}" for i in range(12)),
+]
+
+
+class InvalidPlant(HomeAssistantError):
+    """Plant description that cannot be parsed or fails validation."""
+
+    def __init__(self, errors: list[str]) -> None:
+        """Initialize with all problems found."""
+        super().__init__("; ".join(errors))
+        self.errors = errors
+
+
+def export_plant(options: dict[str, Any], file_format: str) -> str:
+    """Return inverters and strings of the options as text."""
+    inverters = [
+        {key: value for key, value in inv.items() if value is not None}
+        for inv in options.get(CONF_INVERTERS, [])
+    ]
+    strings = [
+        {key: value for key, value in string.items() if value is not None}
+        for string in options.get(CONF_STRINGS, [])
+    ]
+    if file_format == FORMAT_CSV:
+        output = io.StringIO()
+        writer = csv.DictWriter(output, CSV_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows({CSV_TYPE: "inverter", **inv} for inv in inverters)
+        for string in strings:
+            horizon = string.pop(CONF_HORIZON, [])
+            writer.writerow(
+                {
+                    CSV_TYPE: "string",
+                    "name": string.pop(CONF_STRING_NAME),
+                    **string,
+                    **{f"horizon_{i}": value for i, value in enumerate(horizon)},
+                }
+            )
+        return output.getvalue()
+
+    plant = {CONF_INVERTERS: inverters, CONF_STRINGS: strings}
+    if file_format == FORMAT_JSON:
+        return json.dumps(plant, indent=2, ensure_ascii=False)
+    return dump(plant)
+
+
+def _parse(content: str, file_format: str) -> tuple[list[Any], list[Any]]:
+    """Parse the text into raw inverter and string records."""
+    if file_format == FORMAT_CSV:
+        inverters: list[Any] = []
+        strings: list[Any] = []
+        for line, row in enumerate(csv.DictReader(io.StringIO(content)), 2):
+            record = {
+                key: value
+                for key, value in row.items()
+                if key is not None and value not in (None, "")
+            }
+            kind = record.pop(CSV_TYPE, None)
+            if kind == "inverter":
+                inverters.append(record)
+            elif kind == "string":
+                record[CONF_STRING_NAME] = record.pop("name", None)
+                strings.append(record)
+            else:
+                raise InvalidPlant([f"line {line}: type must be inverter or string"])
+        return inverters, strings
+
+    try:
+        if file_format == FORMAT_JSON:
+            plant = json.loads(content)
+        else:
+            plant = parse_yaml(content)
+    except (ValueError, HomeAssistantError) as err:
+        raise InvalidPlant([str(err)]) from err
+    if not isinstance(plant, dict):
+        raise InvalidPlant([f"expected a mapping with {CONF_INVERTERS} and strings"])
+    inverters, strings = plant.get(CONF_INVERTERS), plant.get(CONF_STRINGS)
+    if not isinstance(inverters, list) or not isinstance(strings, list):
+        raise InvalidPlant([f"{CONF_INVERTERS} and {CONF_STRINGS} must be lists"])
+    return inverters, strings
+
+
+def _error_messages(prefix: str, err: vol.Invalid) -> list[str]:
+    """Flatten a voluptuous error into readable messages."""
+    errors = err.errors if isinstance(err, vol.MultipleInvalid) else [err]
+    return [
+        f"{prefix}.{'.'.join(map(str, error.path))}: {error.msg}"
+        if error.path
+        else f"{prefix}: {error.msg}"
+        for error in errors
+    ]
+
+
+def parse_plant(
+    content: str, file_format: str
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Parse and validate a plant description in one pass.
+
+    Every inverter and string is checked against the same schemas as the
+    config flow, and all problems are reported together. Returns the
+    inverters and strings in the form stored in the entry options.
+    """
+    raw_inverters, raw_strings = _parse(content, file_format)
+    errors: list[str] = []
+
+    inverters: list[dict[str, Any]] = []
+    inverter_names: set[str] = set()
+    validate_inverter = inverter_schema()
+    for index, record in enumerate(raw_inverters):
+        prefix = f"{CONF_INVERTERS}[{index}]"
+        try:
+            inverter = validate_inverter(record)
+        except vol.Invalid as err:
+            errors.extend(_error_messages(prefix, err))
+            continue
+        if inverter["name"] in inverter_names:
+            errors.append(f"{prefix}.name: duplicate name {inverter['name']}")
+            continue
+        inverter_names.add(inverter["name"])
+        inverters.append(inverter)
+    if not raw_inverters:
+        errors.append(f"{CONF_INVERTERS}: at least one inverter is required")
+
+    strings: list[dict[str, Any]] = []
+    string_names: set[str] = set()
+    validate_string = string_schema(inverters)
+    for index, record in enumerate(raw_strings):
+        prefix = f"{CONF_STRINGS}[{index}]"
+        if isinstance(record, dict) and CONF_HORIZON in record:
+            record = dict(record)
+            horizon = record.pop(CONF_HORIZON)
+            if not isinstance(horizon, list) or len(horizon) != 12:
+                errors.append(f"{prefix}.{CONF_HORIZON}: expected 12 values")
+                continue
+            record.update({f"horizon_{i}": value for i, value in enumerate(horizon)})
+        try:
+            validated = validate_string(record)
+        except vol.Invalid as err:
+            errors.extend(_error_messages(prefix, err))
+            continue
+        string = {
+            key: value
+            for key, value in validated.items()
+            if not key.startswith("horizon_")
+        }
+        string[CONF_HORIZON] = [validated[f"horizon_{i}"] for i in range(12)]
+        if (name := string[CONF_STRING_NAME]) in string_names:
+            errors.append(f"{prefix}.{CONF_STRING_NAME}: duplicate name {name}")
+            continue
+        string_names.add(name)
+        strings.append(string)
+    if not raw_strings:
+        errors.append(f"{CONF_STRINGS}: at least one string is required")
+
+    if errors:
+        raise InvalidPlant(errors)
+    return inverters, strings
@@ -3,28 +3,59 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import UTC, datetime, timedelta
-from typing import Any
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
 from homeassistant.components.sensor import (
+    RestoreSensor,
     SensorDeviceClass,
-    SensorEntity,
     SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfEnergy, UnitOfPower
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_track_utc_time_change
+from homeassistant.util import dt as dt_util
 
+from .config_flow import Plant
 from .const import (
+    CONF_DEADBAND,
+    CONF_QUANTILES,
+    DEFAULT_DEADBAND,
+    DEFAULT_QUANTILES,
     DOMAIN,
+    SENSOR_TYPE_ENERGY_REMAINING,
     SENSOR_TYPE_INVERTER_FORECAST,
     SENSOR_TYPE_INVERTER_REMAINING,
+    SENSOR_TYPE_POWER,
     SENSOR_TYPE_STRING_FORECAST,
     SENSOR_TYPE_STRING_REMAINING,
+    SIGNAL_OPTIONS_UPDATED,
+    STAT_MEDIAN,
+    statistic_keys,
 )
+from .coordinator import OpenMeteoPVForecastCoordinator
+
+if TYPE_CHECKING:
+    import numpy as np
+
+    from .solar_forecast import ForecastData
+
+REMAINING_SENSOR_TYPES = {
+    SENSOR_TYPE_STRING_REMAINING,
+    SENSOR_TYPE_INVERTER_REMAINING,
+    SENSOR_TYPE_ENERGY_REMAINING,
+}
+STRING_SENSOR_TYPES = {SENSOR_TYPE_STRING_FORECAST, SENSOR_TYPE_STRING_REMAINING}
+
+TARGET_STRING = "string"
+TARGET_INVERTER = "inverter"
+TARGET_PLANT = "plant"
 
 
 @dataclass(frozen=True)
@@ -69,26 +100,204 @@ SENSOR_DESCRIPTIONS = [
     ),
 ]
 
+# Created for every string, inverter and the plant, times every statistic
+TARGET_DESCRIPTIONS = [
+    OpenMeteoPVForecastSensorEntityDescription(
+        key=SENSOR_TYPE_POWER,
+        translation_key="power",
+        device_class=SensorDeviceClass.POWER,
+        state_class=SensorStateClass.MEASUREMENT,
+        native_unit_of_measurement=UnitOfPower.WATT,
+    ),
+    OpenMeteoPVForecastSensorEntityDescription(
+        key=SENSOR_TYPE_ENERGY_REMAINING,
+        translation_key="energy_remaining",
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL,
+        native_unit_of_measurement=UnitOfEnergy.WATT_HOUR,
+    ),
+]
+
+
+def forecast_targets(plant: Plant) -> list[tuple[str, str]]:
+    """Return kind and name of every string, inverter and the plant."""
+    return [
+        *((TARGET_STRING, s.name) for s in plant.strings),
+        *((TARGET_INVERTER, inv.name) for inv in plant.inverters),
+        (TARGET_PLANT, TARGET_PLANT),
+    ]
+
+
+class ForecastView:
+    """Statistics of the current slot and the rest of the day.
+
+    Both are computed once per update from the coordinator data and shared
+    by all sensors of an entry, which only look up their value. An update
+    therefore costs the same however many sensors exist.
+    """
+
+    def __init__(self, coordinator: OpenMeteoPVForecastCoordinator) -> None:
+        """Initialize the view."""
+        self.coordinator = coordinator
+        self.data: ForecastData | None = None
+        self.rows: dict[tuple[str, str], int] = {}
+        self.stat_index: dict[str, int] = {}
+        # Shape (stats, rows); None outside the forecast period
+        self.current: np.ndarray | None = None
+        self.remaining: np.ndarray | None = None
+
+    def refresh(self) -> bool:
+        """Recompute the shared statistics; return False without data."""
+        if (data := self.coordinator.data) is None:
+            return False
+        if data is not self.data:
+            self.rows = {
+                (TARGET_STRING, name): row for row, name in enumerate(data.string_names)
+            }
+            self.rows.update(
+                ((TARGET_INVERTER, name), data.inverter_offset + row)
+                for row, name in enumerate(data.inverter_names)
+            )
+            self.rows[(TARGET_PLANT, TARGET_PLANT)] = data.plant_row
+            self.stat_index = {key: index for index, key in enumerate(data.stat_keys)}
+            self.data = data
+
+        now = dt_util.utcnow()
+        index = data.slot_index(now.timestamp())
+        self.current = data.stats[:, :, index] if index is not None else None
+        midnight = dt_util.start_of_local_day(dt_util.now() + timedelta(days=1))
+        self.remaining = data.energy_statistics(now.timestamp(), midnight.timestamp())
+        return True
+
+    def value(self, remaining: bool, kind: str, name: str, stat: str) -> float | None:
+        """Return one statistic of a target, rounded for the state."""
+        values = self.remaining if remaining else self.current
+        row = self.rows.get((kind, name))
+        index = self.stat_index.get(stat)
+        if values is None or row is None or index is None:
+            return None
+        return round(float(values[index, row]), 1)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
-    """Set up Open-Meteo PV Forecast sensors from config entry."""
-    entities = []
-    for description in SENSOR_DESCRIPTIONS:
-        entities.append(OpenMeteoPVForecastSensor(entry.entry_id, description))
-    async_add_entities(entities, True)
+    """Set up Open-Meteo PV Forecast sensors from config entry.
+
+    Besides the overview sensors, every string, inverter and the plant get a
+    power and a remaining energy sensor per statistic. Option changes add
+    and remove only the affected sensors. A single coordinator listener and
+    slot timer update all of them from the shared ``ForecastView``.
+    """
+    coordinator: OpenMeteoPVForecastCoordinator = hass.data[DOMAIN][entry.entry_id]
+    view = ForecastView(coordinator)
+    view.refresh()
+    entities: dict[str, OpenMeteoPVForecastSensor] = {}
+    overview_ids = {f"{entry.entry_id}_{d.key}" for d in SENSOR_DESCRIPTIONS}
+
+    @callback
+    def _async_sync_entities() -> None:
+        """Add sensors for new targets and statistics, remove stale ones."""
+        deadband = float(entry.options.get(CONF_DEADBAND, DEFAULT_DEADBAND))
+        stats = statistic_keys(entry.options.get(CONF_QUANTILES, DEFAULT_QUANTILES))
+        wanted = {
+            f"{entry.entry_id}_{d.key}": (d, None, None, None)
+            for d in SENSOR_DESCRIPTIONS
+        }
+        for kind, name in forecast_targets(coordinator.plant):
+            for description in TARGET_DESCRIPTIONS:
+                for stat in stats:
+                    wanted[
+                        f"{entry.entry_id}_{kind}_{name}_{description.key}_{stat}"
+                    ] = (description, kind, name, stat)
+
+        entity_registry = er.async_get(hass)
+        for registry_entry in er.async_entries_for_config_entry(
+            entity_registry, entry.entry_id
+        ):
+            if registry_entry.unique_id not in wanted:
+                entity_registry.async_remove(registry_entry.entity_id)
+        for unique_id in entities.keys() - wanted.keys():
+            entities.pop(unique_id)
+
+        new_entities: list[OpenMeteoPVForecastSensor] = []
+        for unique_id, (description, kind, name, stat) in wanted.items():
+            if (entity := entities.get(unique_id)) is not None:
+                entity.deadband = deadband
+                continue
+            if unique_id in overview_ids:
+                entity = OpenMeteoPVForecastSensor(
+                    entry.entry_id, view, description, deadband
+                )
+            else:
+                entity = OpenMeteoPVForecastTargetSensor(
+                    entry.entry_id, view, description, deadband, kind, name, stat
+                )
+            entities[unique_id] = entity
+            new_entities.append(entity)
+        if new_entities:
+            async_add_entities(new_entities)
+
+    @callback
+    def _async_update_sensors(force: bool = True) -> None:
+        """Recompute the shared statistics and push the states.
+
+        New forecasts are always written; slot ticks only write states that
+        moved by at least the deadband.
+        """
+        if not view.refresh():
+            return
+        for entity in entities.values():
+            entity.async_update_forecast(force)
+
+    _async_sync_entities()
+    entry.async_on_unload(coordinator.async_add_listener(_async_update_sensors))
+    entry.async_on_unload(
+        async_dispatcher_connect(
+            hass, f"{SIGNAL_OPTIONS_UPDATED}_{entry.entry_id}", _async_sync_entities
+        )
+    )
+
+    @callback
+    def _async_slot_boundary(now: datetime) -> None:
+        """Move all sensors to the slot that has just started."""
+        if int(now.timestamp()) % coordinator.slot_seconds:
+            return
+        _async_update_sensors(force=False)
+
+    slot_minutes = coordinator.slot_seconds // 60
+    entry.async_on_unload(
+        async_track_utc_time_change(
+            hass,
+            _async_slot_boundary,
+            minute=0 if slot_minutes >= 60 else f"/{slot_minutes}",
+            second=0,
+        )
+    )
+
+
+class OpenMeteoPVForecastSensor(RestoreSensor):
+    """Overview sensor with the plant median and per-target attributes.
 
+    The state is pushed whenever a new forecast arrives. At slot boundaries
+    it is only pushed if it moved by at least the deadband since the last
+    write.
+    """
 
-class OpenMeteoPVForecastSensor(SensorEntity):
-    """Sensor showing PV forecast values."""
+    _attr_should_poll = False
 
     entity_description: OpenMeteoPVForecastSensorEntityDescription
 
     def __init__(
-        self, entry_id: str, description: OpenMeteoPVForecastSensorEntityDescription
+        self,
+        entry_id: str,
+        view: ForecastView,
+        description: OpenMeteoPVForecastSensorEntityDescription,
+        deadband: float = DEFAULT_DEADBAND,
     ) -> None:
         """Initialize the sensor."""
+        self.view = view
+        self.deadband = deadband
         self.entity_description = description
         self._attr_unique_id = f"{entry_id}_{description.key}"
         self._attr_device_info = {
@@ -100,17 +309,101 @@ class OpenMeteoPVForecastSensor(SensorEntity):
         self._attr_has_entity_name = True
         self._attr_extra_state_attributes: dict[str, Any] = {}
 
-    def update(self) -> None:
-        """Update the sensor state."""
-        now = datetime.now(UTC)
-        self._attr_native_value = 0.0
+    async def async_added_to_hass(self) -> None:
+        """Restore the last state until the first forecast is computed."""
+        await super().async_added_to_hass()
+        if self.view.data is not None:
+            self._attr_native_value, self._attr_extra_state_attributes = (
+                self._forecast_state()
+            )
+            return
+        if (last_data := await self.async_get_last_sensor_data()) is not None:
+            self._attr_native_value = last_data.native_value
+        if (last_state := await self.async_get_last_state()) is not None:
+            self._attr_extra_state_attributes = {
+                key: value
+                for key, value in last_state.attributes.items()
+                if isinstance(value, dict)
+            }
 
-        forecast: dict[str, float] = {}
-        for i in range(48):
-            dt = now + timedelta(hours=i)
-            hour = dt.hour
-            # Simple bell curve simulation
-            value = max(0, 10 * (1 - ((hour - 12) / 6) ** 2))
-            forecast[dt.isoformat()] = round(value, 2)
+    @callback
+    def async_update_forecast(self, force: bool = False) -> None:
+        """Write the state if forced or if it moved by at least the deadband."""
+        if self.hass is None or self.view.data is None:
+            return
+        value, attributes = self._forecast_state()
+        previous = self._attr_native_value
+        if not force and (
+            value == previous
+            or (
+                value is not None
+                and previous is not None
+                and abs(value - float(previous)) < self.deadband
+            )
+        ):
+            return
+        self._attr_native_value = value
+        self._attr_extra_state_attributes = attributes
+        self.async_write_ha_state()
+
+    def _forecast_state(self) -> tuple[float | None, dict[str, Any]]:
+        """Return the state and attributes for the current slot.
+
+        The state is the plant median. Attributes hold every statistic per
+        string or per inverter, plus the plant, for the current slot or the
+        rest of the day.
+        """
+        view = self.view
+        remaining = self.entity_description.key in REMAINING_SENSOR_TYPES
+        if (view.remaining if remaining else view.current) is None:
+            return None, {}
+
+        if self.entity_description.key in STRING_SENSOR_TYPES:
+            kind = TARGET_STRING
+        else:
+            kind = TARGET_INVERTER
+        targets = [target for target in view.rows if target[0] == kind]
+        targets.append((TARGET_PLANT, TARGET_PLANT))
+
+        attributes: dict[str, Any] = {
+            name: {
+                stat: view.value(remaining, target_kind, name, stat)
+                for stat in view.stat_index
+            }
+            for target_kind, name in targets
+        }
+        return attributes[TARGET_PLANT][STAT_MEDIAN], attributes
+
+
+class OpenMeteoPVForecastTargetSensor(OpenMeteoPVForecastSensor):
+    """One statistic of one string, inverter or the plant."""
+
+    def __init__(
+        self,
+        entry_id: str,
+        view: ForecastView,
+        description: OpenMeteoPVForecastSensorEntityDescription,
+        deadband: float,
+        kind: str,
+        name: str,
+        stat: str,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(entry_id, view, description, deadband)
+        self.kind = kind
+        self.target = name
+        self.stat = stat
+        self._attr_unique_id = f"{entry_id}_{kind}_{name}_{description.key}_{stat}"
+        if kind == TARGET_PLANT:
+            self._attr_translation_key = f"plant_{description.translation_key}"
+        self._attr_translation_placeholders = {
+            "target": name,
+            "statistic": stat.upper() if stat.startswith("p") else stat,
+        }
+        # Only the median is enabled by default to keep large plants manageable
+        self._attr_entity_registry_enabled_default = stat == STAT_MEDIAN
 
-        self._attr_extra_state_attributes = forecast
+    def _forecast_state(self) -> tuple[float | None, dict[str, Any]]:
+        """Return the statistic for the current slot or the rest of the day."""
+        remaining = self.entity_description.key in REMAINING_SENSOR_TYPES
+        return self.view.value(remaining, self.kind, self.target, self.stat), {}
@@ -0,0 +1,143 @@
+"""Services for Open-Meteo PV Forecast."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from importlib import import_module
+
+import voluptuous as vol
+
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .config_flow import CONF_INVERTERS, CONF_STRINGS
+from .const import (
+    CONF_WEATHER_MODEL,
+    DEFAULT_WEATHER_MODEL,
+    DOMAIN,
+    SERVICE_BACKTEST,
+    SERVICE_EXPORT_PLANT,
+    SERVICE_IMPORT_PLANT,
+    WEATHER_MODELS,
+)
+from .plant_io import FORMAT_YAML, FORMATS, InvalidPlant, export_plant, parse_plant
+
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_START_DATE = "start_date"
+ATTR_END_DATE = "end_date"
+ATTR_WEATHER_MODELS = "weather_models"
+ATTR_FORMAT = "format"
+ATTR_CONTENT = "content"
+
+BACKTEST_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_START_DATE): cv.date,
+        vol.Required(ATTR_END_DATE): cv.date,
+        vol.Optional(ATTR_WEATHER_MODELS): vol.All(
+            cv.ensure_list, [vol.In(WEATHER_MODELS)]
+        ),
+    }
+)
+
+EXPORT_PLANT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_FORMAT, default=FORMAT_YAML): vol.In(FORMATS),
+    }
+)
+
+IMPORT_PLANT_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_FORMAT, default=FORMAT_YAML): vol.In(FORMATS),
+        vol.Required(ATTR_CONTENT): cv.string,
+    }
+)
+
+
+def _loaded_entry(hass: HomeAssistant, call: ServiceCall) -> ConfigEntry:
+    """Return the loaded config entry targeted by a service call."""
+    entry = hass.config_entries.async_get_entry(call.data[ATTR_CONFIG_ENTRY_ID])
+    if (
+        entry is None
+        or entry.domain != DOMAIN
+        or entry.state is not ConfigEntryState.LOADED
+    ):
+        raise ServiceValidationError("Config entry not found or not loaded")
+    return entry
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services."""
+
+    async def async_handle_backtest(call: ServiceCall) -> ServiceResponse:
+        """Score archived forecasts against recorded production."""
+        entry = _loaded_entry(hass, call)
+        if call.data[ATTR_END_DATE] < call.data[ATTR_START_DATE]:
+            raise ServiceValidationError("End date is before start date")
+
+        model_ids = call.data.get(ATTR_WEATHER_MODELS) or [
+            entry.options.get(CONF_WEATHER_MODEL) or DEFAULT_WEATHER_MODEL
+        ]
+        start = dt_util.start_of_local_day(call.data[ATTR_START_DATE])
+        end = dt_util.start_of_local_day(call.data[ATTR_END_DATE]) + timedelta(days=1)
+        backtest = await hass.async_add_import_executor_job(
+            import_module, f"{__package__}.backtest"
+        )
+        return await backtest.async_backtest(hass, entry, start, end, model_ids)
+
+    async def async_handle_export_plant(call: ServiceCall) -> ServiceResponse:
+        """Return the inverters and strings of an entry as text."""
+        entry = _loaded_entry(hass, call)
+        return {
+            ATTR_FORMAT: call.data[ATTR_FORMAT],
+            ATTR_CONTENT: export_plant(dict(entry.options), call.data[ATTR_FORMAT]),
+        }
+
+    async def async_handle_import_plant(call: ServiceCall) -> None:
+        """Replace all inverters and strings of an entry in one update.
+
+        The whole description is validated first; nothing is changed if any
+        part of it is invalid.
+        """
+        entry = _loaded_entry(hass, call)
+        try:
+            inverters, strings = parse_plant(
+                call.data[ATTR_CONTENT], call.data[ATTR_FORMAT]
+            )
+        except InvalidPlant as err:
+            raise ServiceValidationError(f"Invalid plant description: {err}") from err
+        hass.config_entries.async_update_entry(
+            entry,
+            options={**entry.options, CONF_INVERTERS: inverters, CONF_STRINGS: strings},
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_BACKTEST,
+        async_handle_backtest,
+        schema=BACKTEST_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT_PLANT,
+        async_handle_export_plant,
+        schema=EXPORT_PLANT_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_PLANT,
+        async_handle_import_plant,
+        schema=IMPORT_PLANT_SCHEMA,
+    )
@@ -2,40 +2,486 @@
 
 from __future__ import annotations
 
-from datetime import datetime, time, timedelta, timezone
-from typing import Any
-from zoneinfo import ZoneInfo
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone, tzinfo
+from itertools import pairwise
+import math
+from typing import TYPE_CHECKING, Any
 
+import numpy as np
 
-def generate_forecast(config: dict[str, Any]) -> dict[datetime, float]:
-    """Generate solar forecast for the next 48 hours.
+from .const import statistic_keys
 
-    Uses a Gaussian bell curve to simulate daily solar production.
+if TYPE_CHECKING:
+    from .config_flow import Plant, PVString
+
+# Relative DC power change per kelvin of cell temperature above 25 °C
+POWER_TEMP_COEFF = -0.004
+# Below this sine of the solar elevation the beam component is ignored
+MIN_SIN_ELEVATION = 0.01
+# Precision of member and statistic arrays in compact mode
+COMPACT_DTYPE = np.float32
+
+
+class WorkBuffers:
+    """Scratch arrays kept between forecast runs.
+
+    Each name owns one flat allocation that only grows, so intermediates of
+    every time block and every refresh reuse it instead of requesting fresh
+    memory. Arrays handed out here must not end up in a ``ForecastData``.
+    """
+
+    __slots__ = ("_arrays",)
+
+    def __init__(self) -> None:
+        """Initialize the buffers."""
+        self._arrays: dict[str, np.ndarray] = {}
+
+    def get(self, name: str, shape: tuple[int, ...], dtype: Any) -> np.ndarray:
+        """Return an uninitialized contiguous array backed by reused storage."""
+        size = math.prod(shape)
+        storage = self._arrays.get(name)
+        if storage is None or storage.dtype != dtype or storage.size < size:
+            self._arrays.pop(name, None)
+            storage = self._arrays[name] = np.empty(size, dtype)
+        return storage[:size].reshape(shape)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of all buffers in bytes."""
+        return sum(array.nbytes for array in self._arrays.values())
+
+
+@dataclass
+class ForecastData:
+    """Ensemble forecast for all strings, inverters and the plant.
+
+    Rows are ordered strings first, then inverters, then the plant total.
+    Each value is the mean AC power in W over the slot ending at ``times``.
     """
-    tz = ZoneInfo(config.get("timezone", "UTC"))
 
-    # Fixed times for demonstration
-    sunrise = time(6, 0)
-    sunset = time(20, 0)
-    solar_noon = time(13, 0)
+    times: np.ndarray  # slot end as unix seconds, shape (time,)
+    slot_seconds: int
+    string_names: list[str]
+    inverter_names: list[str]
+    stat_keys: list[str]
+    members: np.ndarray  # shape (rows, members, time)
+    stats: np.ndarray  # shape (stats, rows, time)
+    # Member mean before bias correction, shape (rows, time)
+    baseline: np.ndarray
+    # Median plant energy in Wh per hour, keyed by ISO hour start
+    wh_hours: dict[str, float] = field(default_factory=dict)
+    # Computed from clear-sky fallback inputs instead of a weather model run
+    fallback: bool = False
+
+    @property
+    def inverter_offset(self) -> int:
+        """Row index of the first inverter."""
+        return len(self.string_names)
+
+    @property
+    def plant_row(self) -> int:
+        """Row index of the plant total."""
+        return len(self.string_names) + len(self.inverter_names)
+
+    @property
+    def quantiles(self) -> list[float]:
+        """Quantiles (in percent) contained in ``stats`` after min/median/max."""
+        return [float(key[1:]) for key in self.stat_keys[3:]]
+
+    def slot_index(self, timestamp: float) -> int | None:
+        """Return the index of the slot containing ``timestamp``."""
+        index = int(np.searchsorted(self.times, timestamp, side="right"))
+        if index >= len(self.times):
+            return None
+        if self.times[index] - self.slot_seconds > timestamp:
+            return None
+        return index
 
-    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    def energy_statistics(self, start: float, end: float) -> np.ndarray:
+        """Return energy statistics in Wh between two timestamps.
 
-    forecast: dict[datetime, float] = {}
-    peak_power = 10.0
-    curve_width = 3.0
+        The energy is summed per member before the statistics are taken, so
+        the quantiles describe the total rather than a sum of quantiles.
+        Result shape is (stats, rows).
+        """
+        slot_start = self.times - self.slot_seconds
+        overlap = np.clip(
+            np.minimum(self.times, end) - np.maximum(slot_start, start),
+            0,
+            self.slot_seconds,
+        )
+        energy = self.members @ (overlap / 3600.0)
+        return ensemble_statistics(energy[..., np.newaxis], self.quantiles)[..., 0]
 
-    for hour in range(48):
-        dt_utc = now + timedelta(hours=hour)
-        dt_local = dt_utc.astimezone(tz)
 
-        if sunrise <= dt_local.time() <= sunset:
-            delta = (dt_local.hour + dt_local.minute / 60) - solar_noon.hour
-            value = peak_power * (1 - (delta / curve_width) ** 2)
-            value = max(0, value)
-        else:
-            value = 0.0
+def hourly_energy(
+    times: np.ndarray, slot_seconds: int, power: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Bucket slot mean power into hourly energy.
+
+    Returns the hour starts as unix seconds and the energy in Wh per hour.
+    Slots longer than an hour are assigned to the hour they start in.
+    """
+    hours = (times - slot_seconds) // 3600 * 3600
+    starts = np.flatnonzero(np.diff(hours, prepend=-1))
+    energy = np.add.reduceat(power * (slot_seconds / 3600.0), starts)
+    return hours[starts], energy
+
+
+def member_array(hourly: dict[str, Any], variable: str) -> np.ndarray:
+    """Stack the control run and all members of a variable into (members, time)."""
+    keys = sorted(
+        key
+        for key in hourly
+        if key == variable or key.startswith(f"{variable}_member")
+    )
+    return np.array([hourly[key] for key in keys], dtype=float)
+
+
+def ensemble_inputs(
+    hourly: dict[str, Any],
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return slot ends, GHI, DHI and air temperature from an API response."""
+    return (
+        np.array(hourly["time"], dtype=float),
+        member_array(hourly, "shortwave_radiation"),
+        member_array(hourly, "diffuse_radiation"),
+        member_array(hourly, "temperature_2m"),
+    )
+
+
+def ensemble_statistics(
+    members: np.ndarray,
+    quantiles: Sequence[float],
+    buffers: WorkBuffers | None = None,
+) -> np.ndarray:
+    """Return min, median, max and the requested quantiles over the member axis.
+
+    ``members`` has shape (rows, members, time). All order statistics are
+    obtained from a single ``np.partition`` call, which places every needed
+    rank in O(n) instead of fully sorting the member axis. Quantiles use
+    linear interpolation between ranks, matching ``np.quantile``. With
+    ``buffers`` the partition works in a reused copy of ``members``.
+    Result shape is (stats, rows, time).
+    """
+    count = members.shape[1]
+    positions = np.array([0.0, 50.0, 100.0, *quantiles]) / 100.0 * (count - 1)
+    lower = np.floor(positions).astype(np.intp)
+    upper = np.minimum(lower + 1, count - 1)
+    kth = np.unique(np.concatenate((lower, upper)))
+
+    if buffers is None:
+        ranked = np.partition(members, kth, axis=1)
+    else:
+        ranked = buffers.get("ranked", members.shape, members.dtype)
+        np.copyto(ranked, members)
+        ranked.partition(kth, axis=1)
+    low = ranked[:, lower, :]
+    high = ranked[:, upper, :]
+    weight = (positions - lower).astype(members.dtype)[np.newaxis, :, np.newaxis]
+    return np.moveaxis(low + (high - low) * weight, 1, 0)
+
+
+def solar_position(
+    timestamps: np.ndarray, latitude: float, longitude: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return solar elevation and azimuth (from north, clockwise) in degrees.
+
+    Uses the low-precision almanac algorithm, accurate to about 0.01° which
+    is far below the resolution of the weather models.
+    """
+    days = timestamps / 86400.0 - 10957.5  # days since J2000.0
+    mean_longitude = np.radians((280.460 + 0.9856474 * days) % 360)
+    mean_anomaly = np.radians((357.528 + 0.9856003 * days) % 360)
+    ecliptic_longitude = (
+        mean_longitude
+        + np.radians(1.915) * np.sin(mean_anomaly)
+        + np.radians(0.020) * np.sin(2 * mean_anomaly)
+    )
+    obliquity = np.radians(23.439 - 0.0000004 * days)
+    right_ascension = np.arctan2(
+        np.cos(obliquity) * np.sin(ecliptic_longitude), np.cos(ecliptic_longitude)
+    )
+    declination = np.arcsin(np.sin(obliquity) * np.sin(ecliptic_longitude))
 
-        forecast[dt_utc] = round(value, 2)
+    sidereal = np.radians((280.46061837 + 360.98564736629 * days + longitude) % 360)
+    hour_angle = sidereal - right_ascension
+    lat = np.radians(latitude)
+
+    elevation = np.arcsin(
+        np.sin(lat) * np.sin(declination)
+        + np.cos(lat) * np.cos(declination) * np.cos(hour_angle)
+    )
+    azimuth = np.arctan2(
+        -np.sin(hour_angle),
+        np.tan(declination) * np.cos(lat) - np.sin(lat) * np.cos(hour_angle),
+    )
+    return np.degrees(elevation), np.degrees(azimuth) % 360
+
+
+def string_dc_power(
+    timestamps: np.ndarray,
+    ghi: np.ndarray,
+    dhi: np.ndarray,
+    temp_air: np.ndarray,
+    latitude: float,
+    longitude: float,
+    strings: Sequence[PVString],
+    out: np.ndarray | None = None,
+    buffers: WorkBuffers | None = None,
+) -> np.ndarray:
+    """Return DC power in W for every string and ensemble member.
+
+    ``ghi``, ``dhi`` and ``temp_air`` have shape (members, time) and hold
+    slot means. The sun position is taken at the slot centre. Transposition
+    uses the isotropic sky model, beam irradiance is blocked below the
+    configured horizon and cell temperature follows the Ross model.
+
+    Strings are evaluated one at a time, so temporaries stay at
+    (members, time) however large the plant is. The result has shape
+    (strings, members, time) and is written to ``out`` if given, in its
+    dtype.
+    """
+    elevation, sun_azimuth = solar_position(timestamps, latitude, longitude)
+    sin_elevation = np.sin(np.radians(elevation))
+    zenith = np.radians(90.0 - elevation)
+
+    tilt = np.radians([s.tilt for s in strings])[:, np.newaxis]
+    # Configured azimuth is 0° = south, -90° = east; convert to compass bearing
+    surface_azimuth = np.radians([180.0 + s.azimuth for s in strings])
+    horizon = np.array([s.horizon for s in strings], dtype=float).reshape(-1, 12)
+    albedo = np.array([s.albedo for s in strings])
+    cell_coeff = [s.cell_coeff for s in strings]
+    power_kw = [s.power_w / 1000.0 for s in strings]
+
+    cos_aoi = np.cos(zenith) * np.cos(tilt) + np.sin(zenith) * np.sin(tilt) * np.cos(
+        np.radians(sun_azimuth) - surface_azimuth[:, np.newaxis]
+    )
+    sector = (sun_azimuth // 30).astype(np.intp) % 12
+    visible = elevation > horizon[:, sector]
+    beam_factor = np.where(
+        visible & (sin_elevation > MIN_SIN_ELEVATION),
+        np.clip(cos_aoi, 0, None) / np.maximum(sin_elevation, MIN_SIN_ELEVATION),
+        0.0,
+    )
+    sky_view = (1 + np.cos(tilt[:, 0])) / 2
+    ground_view = albedo * (1 - np.cos(tilt[:, 0])) / 2
+
+    if out is None:
+        out = np.empty((len(strings), *ghi.shape))
+    dtype = out.dtype
+    ghi = np.clip(np.nan_to_num(ghi), 0, None).astype(dtype, copy=False)
+    dhi = np.minimum(np.clip(np.nan_to_num(dhi), 0, None), ghi).astype(
+        dtype, copy=False
+    )
+    beam = ghi - dhi
+    temp_offset = np.nan_to_num(temp_air, nan=15.0).astype(dtype) - 25.0
+
+    if buffers is None:
+        buffers = WorkBuffers()
+    poa = buffers.get("poa", ghi.shape, dtype)
+    scratch = buffers.get("scratch", ghi.shape, dtype)
+    for row in range(len(strings)):
+        np.multiply(beam, beam_factor[row], out=poa)
+        poa += np.multiply(dhi, sky_view[row], out=scratch)
+        poa += np.multiply(ghi, ground_view[row], out=scratch)
+        # Temperature derating 1 + γ (T_air + k·POA - 25)
+        np.multiply(poa, cell_coeff[row], out=scratch)
+        scratch += temp_offset
+        scratch *= POWER_TEMP_COEFF
+        scratch += 1.0
+        np.multiply(poa, scratch, out=out[row])
+        out[row] *= power_kw[row]
+        np.clip(out[row], 0, None, out=out[row])
+    return out
+
+
+def aggregate_members(
+    string_ac: np.ndarray,
+    membership: np.ndarray,
+    max_ac: np.ndarray,
+    out: np.ndarray | None = None,
+) -> np.ndarray:
+    """Stack string, clipped inverter and plant power into one member array."""
+    strings, inverters = len(string_ac), len(max_ac)
+    if out is None:
+        out = np.empty(
+            (strings + inverters + 1, *string_ac.shape[1:]), string_ac.dtype
+        )
+    out[:strings] = string_ac
+    inverter_ac = out[strings : strings + inverters]
+    np.einsum(
+        "is,smt->imt", membership.astype(out.dtype), string_ac, out=inverter_ac
+    )
+    np.minimum(inverter_ac, max_ac[:, np.newaxis, np.newaxis], out=inverter_ac)
+    inverter_ac.sum(axis=0, out=out[-1])
+    return out
+
+
+def local_day_ends(timestamps: np.ndarray, slot_seconds: int, tz: tzinfo) -> list[int]:
+    """Return the end index of the slots of every local day.
+
+    A slot belongs to the day it starts in, so the first block ends at the
+    first local midnight and each further block spans one local day.
+    """
+    if not len(timestamps):
+        return []
+    starts = timestamps - slot_seconds
+    first = datetime.fromtimestamp(starts[0], tz).date()
+    last = datetime.fromtimestamp(starts[-1], tz).date()
+    midnights = [
+        datetime.combine(first + timedelta(days=day), time.min, tz).timestamp()
+        for day in range(1, (last - first).days + 1)
+    ]
+    ends = np.searchsorted(starts, midnights).tolist()
+    return [*ends, len(timestamps)]
+
+
+def iter_forecast(
+    timestamps: np.ndarray,
+    ghi: np.ndarray,
+    dhi: np.ndarray,
+    temp_air: np.ndarray,
+    latitude: float,
+    longitude: float,
+    plant: Plant,
+    quantiles: Sequence[float],
+    slot_seconds: int = 3600,
+    string_factors: Mapping[str, float] | None = None,
+    compact: bool = False,
+    buffers: WorkBuffers | None = None,
+    tz: tzinfo = timezone.utc,
+    fallback: bool = False,
+) -> Iterator[ForecastData]:
+    """Compute the ensemble forecast one local day at a time, nearest first.
+
+    Blocks end at midnight in ``tz``, so the first one covers the rest of
+    the current day. Each block runs through geometry, transposition,
+    thermal model, aggregation and statistics on its own, so intermediates
+    are bounded by one day whatever the horizon. Results are written into
+    arrays allocated once for the full horizon. After every block a
+    ``ForecastData`` covering the start up to that block is yielded; the
+    last one is complete. Nothing is yielded without slots.
+
+    ``string_factors`` holds learned bias corrections by string name. They
+    scale the string power before inverter clipping; the uncorrected member
+    mean is kept as ``baseline`` so the corrections can keep learning.
+
+    In ``compact`` mode members and statistics are stored as float32, which
+    halves the memory held between refreshes. ``buffers`` keeps the
+    per-block intermediates allocated across calls. ``fallback`` marks the
+    result as computed from clear-sky inputs.
+    """
+    inverter_names = [inv.name for inv in plant.inverters]
+    string_names = [s.name for s in plant.strings]
+    stat_keys = statistic_keys(quantiles)
+    dtype = COMPACT_DTYPE if compact else np.float64
+    if buffers is None:
+        buffers = WorkBuffers()
+
+    inverter_index = np.array(
+        [inverter_names.index(s.inverter) for s in plant.strings], dtype=np.intp
+    )
+    membership = np.zeros((len(inverter_names), len(string_names)))
+    membership[inverter_index, np.arange(len(string_names))] = 1.0
+    efficiency = np.array([inv.inverter_eff for inv in plant.inverters])
+    max_ac = np.array([inv.max_ac_w or np.inf for inv in plant.inverters])
+    factors = np.array([(string_factors or {}).get(name, 1.0) for name in string_names])
+
+    member_count, slots = ghi.shape
+    rows = len(string_names) + len(inverter_names) + 1
+    members = np.empty((rows, member_count, slots), dtype)
+    baseline = np.empty((rows, slots), dtype)
+    stats = np.empty((len(stat_keys), rows, slots), dtype)
+    centre = timestamps - slot_seconds / 2
+
+    day_ends = local_day_ends(timestamps, slot_seconds, tz)
+    for start, end in pairwise([0, *day_ends]):
+        window = slice(start, end)
+        string_ac = string_dc_power(
+            centre[window],
+            ghi[:, window],
+            dhi[:, window],
+            temp_air[:, window],
+            latitude,
+            longitude,
+            plant.strings,
+            out=buffers.get(
+                "string_ac", (len(string_names), member_count, end - start), dtype
+            ),
+            buffers=buffers,
+        )
+        string_ac *= efficiency[inverter_index][:, np.newaxis, np.newaxis]
+        block_members = aggregate_members(
+            string_ac, membership, max_ac, out=members[:, :, window]
+        )
+        baseline[:, window] = block_members.mean(axis=1)
+        if string_factors:
+            string_ac *= factors[:, np.newaxis, np.newaxis]
+            aggregate_members(string_ac, membership, max_ac, out=block_members)
+        stats[:, :, window] = ensemble_statistics(block_members, quantiles, buffers)
+
+        hours, energy = hourly_energy(
+            timestamps[:end], slot_seconds, stats[1, -1, :end]
+        )
+        yield ForecastData(
+            times=timestamps[:end],
+            slot_seconds=slot_seconds,
+            string_names=string_names,
+            inverter_names=inverter_names,
+            stat_keys=stat_keys,
+            members=members[:, :, :end],
+            stats=stats[:, :, :end],
+            baseline=baseline[:, :end],
+            wh_hours={
+                datetime.fromtimestamp(hour, timezone.utc).isoformat(): round(
+                    value, 1
+                )
+                for hour, value in zip(hours.tolist(), energy.tolist())
+            },
+            fallback=fallback,
+        )
+
+
+def compute_forecast(
+    timestamps: np.ndarray,
+    ghi: np.ndarray,
+    dhi: np.ndarray,
+    temp_air: np.ndarray,
+    latitude: float,
+    longitude: float,
+    plant: Plant,
+    quantiles: Sequence[float],
+    slot_seconds: int = 3600,
+    string_factors: Mapping[str, float] | None = None,
+    compact: bool = False,
+    buffers: WorkBuffers | None = None,
+    tz: tzinfo = timezone.utc,
+) -> ForecastData:
+    """Compute the complete ensemble forecast, see ``iter_forecast``.
+
+    Raises ValueError if there are no slots to forecast.
+    """
+    data: ForecastData | None = None
+    for data in iter_forecast(
+        timestamps,
+        ghi,
+        dhi,
+        temp_air,
+        latitude,
+        longitude,
+        plant,
+        quantiles,
+        slot_seconds=slot_seconds,
+        string_factors=string_factors,
+        compact=compact,
+        buffers=buffers,
+        tz=tz,
+    ):
+        pass
+    if data is None:
+        raise ValueError("No forecast slots")
+    return data
 
-    return forecast
@@ -0,0 +1 @@
+"""Tests for the Open-Meteo PV Forecast integration."""
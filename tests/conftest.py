@@ -0,0 +1,36 @@
+"""Fixtures for the Open-Meteo PV Forecast tests."""
+
+import numpy as np
+import pytest
+
+from ..config_flow import Inverter, Plant, PVString
+
+# 2024-06-01T00:00:00Z
+START = 1717200000
+
+
+@pytest.fixture
+def plant() -> Plant:
+    """Return two strings on one clipped inverter and one on another."""
+    flat = (0.0,) * 12
+    return Plant(
+        inverters=(
+            Inverter("west", 8000, max_ac_w=4000, inverter_eff=0.97),
+            Inverter("east", 5000),
+        ),
+        strings=(
+            PVString("south", "west", 180, 30, 3000, flat),
+            PVString("roof", "west", 200, 45, 2500, (10.0,) * 12),
+            PVString("garage", "east", 90, 15, 2000, flat),
+        ),
+    )
+
+
+@pytest.fixture
+def weather() -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Return four days of hourly inputs for five members."""
+    times = START + 3600 * np.arange(1, 97, dtype=float)
+    rng = np.random.default_rng(7)
+    daylight = np.clip(np.sin((times / 86400 % 1 - 0.25) * 2 * np.pi), 0, None)
+    ghi = 900 * daylight * rng.uniform(0.2, 1.0, size=(5, len(times)))
+    return times, ghi, 0.3 * ghi, rng.uniform(5, 25, size=(5, len(times)))
@@ -0,0 +1,114 @@
+"""Tests for the forecast archive."""
+
+import json
+
+import numpy as np
+import pytest
+
+from ..archive import ForecastArchive, archive_layout
+from ..solar_forecast import ForecastData, compute_forecast
+from .conftest import START
+
+INTERVAL = 3 * 3600
+SLOTS = 48
+
+
+@pytest.fixture
+def forecast(plant, weather) -> ForecastData:
+    """Return a four-day forecast with two quantiles."""
+    times, ghi, dhi, temp_air = weather
+    return compute_forecast(times, ghi, dhi, temp_air, 52.5, 13.4, plant, [10, 90])
+
+
+def open_archive(tmp_path, forecast, capacity: int) -> ForecastArchive:
+    """Open the archive in ``tmp_path`` for the layout of ``forecast``."""
+    layout = archive_layout(forecast, SLOTS, INTERVAL)
+    return ForecastArchive.open(tmp_path / "archive.npy", layout, capacity)
+
+
+def test_append_and_lookup(tmp_path, forecast) -> None:
+    """A run is found by any time within its interval and cut to the slots."""
+    archive = open_archive(tmp_path, forecast, 8)
+
+    archive.append(START + 600, forecast)
+
+    times, stats = archive.lookup(START + INTERVAL - 1)
+    np.testing.assert_array_equal(times, forecast.times[:SLOTS])
+    np.testing.assert_allclose(stats, forecast.stats[..., :SLOTS], rtol=1e-6)
+    assert not stats.flags.writeable
+    assert archive.lookup(START + INTERVAL) is None
+    assert archive.issue_times().tolist() == [START]
+
+
+def test_ring_overwrites_oldest(tmp_path, forecast) -> None:
+    """After ``capacity`` intervals a record is reused by the newer run."""
+    archive = open_archive(tmp_path, forecast, 4)
+    size = (tmp_path / "archive.npy").stat().st_size
+
+    for run in range(6):
+        archive.append(START + run * INTERVAL, forecast)
+
+    assert (tmp_path / "archive.npy").stat().st_size == size
+    assert archive.issue_times().tolist() == [
+        START + run * INTERVAL for run in range(2, 6)
+    ]
+    assert archive.lookup(START) is None
+
+
+def test_runs_in_period(tmp_path, forecast) -> None:
+    """Runs are returned oldest first with their slot ends."""
+    archive = open_archive(tmp_path, forecast, 4)
+    for run in (3, 1, 2, 0):
+        archive.append(START + run * INTERVAL, forecast)
+
+    issued, times, stats = archive.runs(START + INTERVAL, START + 3 * INTERVAL)
+
+    assert issued.tolist() == [START + INTERVAL, START + 2 * INTERVAL]
+    assert times.shape == (2, SLOTS)
+    np.testing.assert_array_equal(times[0], forecast.times[:SLOTS])
+    assert stats.shape == (2, *forecast.stats[..., :SLOTS].shape)
+
+
+def test_resize_keeps_newest_runs(tmp_path, forecast) -> None:
+    """Reopening with another capacity keeps the runs that still fit."""
+    archive = open_archive(tmp_path, forecast, 8)
+    for run in range(6):
+        archive.append(START + run * INTERVAL, forecast)
+    del archive
+
+    archive = open_archive(tmp_path, forecast, 3)
+
+    assert archive.capacity == 3
+    assert archive.issue_times().tolist() == [
+        START + run * INTERVAL for run in range(3, 6)
+    ]
+    assert archive.lookup(START + 5 * INTERVAL) is not None
+    assert not (tmp_path / "archive.tmp.npy").exists()
+
+
+def test_layout_change_keeps_one_previous_archive(
+    tmp_path, plant, weather, forecast
+) -> None:
+    """A new layout starts a new archive and replaces the previous one."""
+    times, ghi, dhi, temp_air = weather
+    archive = open_archive(tmp_path, forecast, 4)
+    archive.append(START, forecast)
+    del archive
+
+    for quantiles in ([25, 75], [5, 95]):
+        other = compute_forecast(
+            times, ghi, dhi, temp_air, 52.5, 13.4, plant, quantiles
+        )
+        archive = open_archive(tmp_path, other, 4)
+        assert archive.issue_times().size == 0
+        archive.append(START + INTERVAL, other)
+        del archive
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "archive.json",
+        "archive.npy",
+        "archive_previous.json",
+        "archive_previous.npy",
+    ]
+    previous = json.loads((tmp_path / "archive_previous.json").read_text())
+    assert previous["stat_keys"][3:] == ["p25", "p75"]
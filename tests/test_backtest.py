@@ -0,0 +1,135 @@
+"""Tests for the backtest scoring."""
+
+import numpy as np
+import pytest
+
+from ..backtest import crps_ensemble, evaluate_archive, quantile_score, slot_means
+from ..bias import SensorLink
+
+HOUR = 3600
+
+
+def test_slot_means_integrates_power_steps() -> None:
+    """Power readings are integrated as a step function per slot."""
+    times = np.array([0, 1800, HOUR, 2 * HOUR], dtype=float)
+    values = np.array([100, 300, 50, 50], dtype=float)
+
+    means = slot_means(np.array([HOUR, 2 * HOUR]), HOUR, times, values, False)
+
+    np.testing.assert_allclose(means, [200, 50])
+
+
+def test_slot_means_needs_coverage() -> None:
+    """Slots mostly covered by unavailable readings are NaN."""
+    times = np.array([0, 600], dtype=float)
+    values = np.array([100, np.nan])
+
+    assert np.isnan(slot_means(np.array([HOUR]), HOUR, times, values, False)).all()
+
+
+def test_slot_means_differences_energy_counter() -> None:
+    """Energy counters are differenced at the slot boundaries."""
+    times = np.array([0, HOUR, 2 * HOUR], dtype=float)
+    values = np.array([1000, 1400, 1400], dtype=float)
+
+    means = slot_means(np.array([HOUR, 2 * HOUR]), HOUR, times, values, True)
+
+    np.testing.assert_allclose(means, [400, 0])
+
+
+@pytest.mark.parametrize("is_energy", [False, True])
+def test_slot_means_masks_slots_after_until(is_energy: bool) -> None:
+    """The last reading is not carried into time that was not recorded."""
+    times = np.arange(5, dtype=float) * HOUR
+    values = np.array([150, 200, np.nan, 300, 300])
+    slot_ends = np.arange(1, 9, dtype=float) * HOUR
+
+    means = slot_means(slot_ends, HOUR, times, values, is_energy, until=5 * HOUR)
+
+    assert np.isnan(means[5:]).all()
+    assert not np.isnan(means[:2]).any()
+
+
+def test_crps_ensemble_matches_pairwise_form() -> None:
+    """The sorted-member CRPS equals the O(m²) definition."""
+    rng = np.random.default_rng(1)
+    members = rng.uniform(0, 500, size=(2, 7, 5))
+    observed = rng.uniform(0, 500, size=(2, 5))
+
+    expected = np.abs(members - observed[:, np.newaxis]).mean(axis=1) - 0.5 * (
+        np.abs(members[:, :, np.newaxis] - members[:, np.newaxis]).mean(axis=(1, 2))
+    )
+
+    np.testing.assert_allclose(crps_ensemble(members, observed), expected)
+
+
+def test_crps_ensemble_of_single_member_is_absolute_error() -> None:
+    """A deterministic forecast scores its absolute error."""
+    members = np.array([[[100.0, 300.0]]])
+    observed = np.array([[150.0, 300.0]])
+
+    np.testing.assert_allclose(crps_ensemble(members, observed), [[50, 0]])
+
+
+def test_quantile_score_of_median_is_absolute_error() -> None:
+    """Twice the pinball loss at the median is the absolute error."""
+    observed = np.array([100.0, 250.0])
+
+    score = quantile_score(np.array([[150.0, 200.0]]), [0.5], observed)
+
+    np.testing.assert_allclose(score, [50, 50])
+
+
+def test_quantile_score_rewards_calibrated_spread() -> None:
+    """Quantiles around the outcome score better than a biased band."""
+    observed = np.array([100.0])
+    levels = [0.1, 0.5, 0.9]
+
+    centred = quantile_score(np.array([[80.0], [100.0], [120.0]]), levels, observed)
+    biased = quantile_score(np.array([[180.0], [200.0], [220.0]]), levels, observed)
+
+    assert centred < biased
+
+
+def _archive_runs() -> tuple[np.ndarray, np.ndarray, np.ndarray, dict]:
+    """Return two archived runs of one string with a constant forecast."""
+    layout = {
+        "slot_seconds": HOUR,
+        "stat_keys": ["min", "median", "max", "p10", "p90"],
+        "string_names": ["south"],
+        "inverter_names": ["inv"],
+    }
+    issued = np.array([0, 3 * HOUR])
+    times = np.arange(1, 7)[np.newaxis, :] * HOUR + issued[:, np.newaxis]
+    stats = np.empty((2, 5, 3, 6), dtype=np.float32)
+    for stat, value in enumerate([50, 100, 150, 80, 120]):
+        stats[:, stat] = value
+    stats[1, :, :, 4:] = np.nan  # shorter horizon of the second run
+    return issued, times, stats, layout
+
+
+def test_evaluate_archive_scores_runs_by_issue_time() -> None:
+    """Each run is scored on its own slots, up to the end of the recording."""
+    issued, times, stats, layout = _archive_runs()
+    links = [
+        SensorLink("string", "south", 0, "sensor.south"),
+        SensorLink("string", "removed", 1, "sensor.removed"),
+    ]
+    recording = np.arange(0, 12) * HOUR
+    series = {
+        "sensor.south": (recording.astype(float), np.full(12, 130.0), False),
+        "sensor.removed": (recording.astype(float), np.full(12, 0.0), False),
+    }
+
+    scores = evaluate_archive(issued, times, stats, layout, links, series, 7 * HOUR)
+
+    # Run 1: slots ending 1..6 h; run 2: 4..7 h (8 and 9 h are unrecorded)
+    assert scores == {
+        "string:south": {
+            "mae": 30.0,
+            "rmse": 30.0,
+            # 2 * mean pinball loss of P10, median and P90 against 130 W
+            "crps": 19.3,
+            "samples": 10,
+        }
+    }
@@ -0,0 +1,144 @@
+"""Tests for the online bias correction."""
+
+from dataclasses import replace
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from homeassistant.core import State
+
+from ..bias import (
+    BIAS_FACTOR_MAX,
+    BIAS_MIN_WEIGHT,
+    BiasCorrection,
+    SensorLink,
+    sensor_links,
+)
+from ..config_flow import Plant
+from ..solar_forecast import ForecastData
+from .conftest import START
+
+
+@pytest.fixture
+def linked_plant(plant) -> Plant:
+    """Return the plant with sensors on the south string and west inverter."""
+    return Plant(
+        inverters=(
+            replace(plant.inverters[0], actual_sensor="sensor.west"),
+            plant.inverters[1],
+        ),
+        strings=(
+            replace(plant.strings[0], actual_sensor="sensor.south"),
+            *plant.strings[1:],
+        ),
+    )
+
+
+def bias_correction(
+    plant: Plant, data: ForecastData | None, watts: float
+) -> BiasCorrection:
+    """Return a bias correction whose sensors all read ``watts``."""
+    hass = SimpleNamespace(
+        data={},
+        config=SimpleNamespace(config_dir="/tmp", path=lambda *parts: "/tmp"),
+        states=SimpleNamespace(
+            get=lambda entity_id: State(
+                entity_id, str(watts), {"unit_of_measurement": "W"}
+            )
+        ),
+    )
+    bias = BiasCorrection(
+        hass, SimpleNamespace(entry_id="entry"), SimpleNamespace(data=data)
+    )
+    bias._store = SimpleNamespace(async_delay_save=lambda *args: None)
+    bias.async_set_plant(plant)
+    return bias
+
+
+def forecast(baseline: float, fallback: bool = False) -> ForecastData:
+    """Return two hourly slots ending at START + 1 h and + 2 h."""
+    rows = 6
+    return ForecastData(
+        times=START + 3600.0 * np.arange(1, 3),
+        slot_seconds=3600,
+        string_names=["south", "roof", "garage"],
+        inverter_names=["west", "east"],
+        stat_keys=["min", "median", "max"],
+        members=np.full((rows, 1, 2), baseline),
+        stats=np.full((3, rows, 2), baseline),
+        baseline=np.full((rows, 2), baseline),
+        fallback=fallback,
+    )
+
+
+def utc(timestamp: float) -> datetime:
+    """Return a UTC datetime."""
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+def test_sensor_links_follow_forecast_rows(linked_plant) -> None:
+    """Strings and inverters with a sensor are linked to their rows."""
+    links = sensor_links(linked_plant)
+
+    assert [(link.kind, link.name, link.row) for link in links] == [
+        ("string", "south", 0),
+        ("inverter", "west", 3),
+    ]
+
+
+def test_power_link_integrates_complete_slots() -> None:
+    """The first slot is incomplete, later ones give the mean power."""
+    link = SensorLink("string", "south", 0, "sensor.south")
+    link.start((1000.0, "W"), START + 1800)
+
+    assert link.close_slot((1000.0, "W"), START + 3600, 3600) is None
+
+    link.update((2.0, "kW"), START + 5400)
+    assert link.close_slot((2000.0, "W"), START + 7200, 3600) == 1500.0
+
+
+def test_energy_link_differences_counter() -> None:
+    """Energy counters give the mean power and skip resets."""
+    link = SensorLink("inverter", "west", 3, "sensor.west")
+    link.start((1.0, "kWh"), START)
+
+    assert link.close_slot((1.5, "kWh"), START + 3600, 3600) is None
+    assert link.close_slot((2.25, "kWh"), START + 7200, 3600) == 750.0
+    assert link.close_slot((0.0, "kWh"), START + 10800, 3600) is None
+
+
+def test_string_factors_fall_back_to_inverter(linked_plant) -> None:
+    """Strings use their own factor, else that of their inverter."""
+    bias = bias_correction(linked_plant, None, 0.0)
+    south, west = sensor_links(linked_plant)
+    bias._state = {
+        south.key: [900.0, 1000.0, BIAS_MIN_WEIGHT],
+        west.key: [5000.0, 1000.0, BIAS_MIN_WEIGHT],
+    }
+
+    assert bias.factor(south.key) == pytest.approx(0.9)
+    assert bias.string_factors(linked_plant) == {
+        "south": pytest.approx(0.9),
+        "roof": BIAS_FACTOR_MAX,
+    }
+
+    bias._state[west.key][2] = BIAS_MIN_WEIGHT / 2
+    assert bias.string_factors(linked_plant) == {"south": pytest.approx(0.9)}
+
+
+@pytest.mark.parametrize("fallback", [False, True])
+def test_slot_boundary_learns_from_model_forecasts_only(linked_plant, fallback) -> None:
+    """Closed slots are compared with the baseline unless it is a fallback."""
+    bias = bias_correction(linked_plant, forecast(1000.0, fallback), 800.0)
+    for link in bias._links:
+        link.start((800.0, "W"), START)
+
+    bias._async_slot_boundary(utc(START + 3600))
+    bias._async_slot_boundary(utc(START + 7200))
+
+    if fallback:
+        assert bias._state == {}
+    else:
+        assert bias._state == {link.key: [800.0, 1000.0, 1.0] for link in bias._links}
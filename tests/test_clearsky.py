@@ -0,0 +1,98 @@
+"""Tests for the clear-sky fallback."""
+
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from ..clearsky import (
+    ClearSkyTable,
+    build_table,
+    daily_linke_turbidity,
+    ineichen,
+    monthly_linke_turbidity,
+)
+from ..solar_forecast import iter_forecast
+
+LATITUDE = 52.5
+LONGITUDE = 13.4
+
+
+@pytest.fixture(scope="module")
+def table() -> ClearSkyTable:
+    """Return an hourly clear-sky table for Berlin."""
+    return ClearSkyTable(build_table(LATITUDE, LONGITUDE, 34.0, 3600), 3600)
+
+
+def day_ends(year: int, month: int, day: int) -> np.ndarray:
+    """Return the ends of the hourly slots of a UTC day."""
+    midnight = datetime(year, month, day, tzinfo=timezone.utc).timestamp()
+    return midnight + 3600 * np.arange(1, 25, dtype=float)
+
+
+def test_lookup_matches_model_at_slot_centre(table) -> None:
+    """The table holds the Ineichen model evaluated at the slot centres."""
+    times = day_ends(2024, 6, 1)
+    turbidity = daily_linke_turbidity(monthly_linke_turbidity(LATITUDE))[152]
+
+    ghi, dhi = table.lookup(times)
+    expected_ghi, expected_dhi = ineichen(
+        times - 1800, LATITUDE, LONGITUDE, 34.0, np.full(len(times), turbidity)
+    )
+
+    np.testing.assert_allclose(ghi, expected_ghi, rtol=1e-5, atol=1e-3)
+    np.testing.assert_allclose(dhi, expected_dhi, rtol=1e-5, atol=1e-3)
+    assert ghi.max() > 700
+
+
+@pytest.mark.parametrize(("month", "day"), [(1, 15), (2, 28), (3, 1), (12, 31)])
+def test_lookup_by_calendar_day(table, month, day) -> None:
+    """Leap and common years read the same row for the same calendar day."""
+    leap = table.lookup(day_ends(2024, month, day))
+    common = table.lookup(day_ends(2023, month, day))
+
+    np.testing.assert_array_equal(leap[0], common[0])
+    np.testing.assert_array_equal(leap[1], common[1])
+
+
+def test_lookup_of_leap_day(table) -> None:
+    """29 February has its own row between 28 February and 1 March."""
+    leap_day = table.lookup(day_ends(2024, 2, 29))[0]
+
+    assert not np.array_equal(leap_day, table.lookup(day_ends(2024, 2, 28))[0])
+    assert not np.array_equal(leap_day, table.lookup(day_ends(2024, 3, 1))[0])
+
+
+def test_turbidity_by_climate_zone() -> None:
+    """Turbidity follows the climate zone and the season of the hemisphere."""
+    tropical = monthly_linke_turbidity(5.0)
+    temperate = monthly_linke_turbidity(LATITUDE)
+    polar = monthly_linke_turbidity(65.0)
+
+    assert min(tropical) > max(polar)
+    assert np.mean(tropical) > np.mean(temperate) > np.mean(polar)
+    # Hazier in the local summer
+    assert temperate[6] > temperate[0]
+    assert monthly_linke_turbidity(-LATITUDE)[0] == temperate[6]
+
+
+def test_clear_sky_index_without_slots(table) -> None:
+    """Without slots there is no clear-sky index."""
+    assert table.clear_sky_index(np.array([]), np.empty((1, 0))) is None
+
+
+def test_fallback_forecast_is_marked(plant, table) -> None:
+    """Forecasts from clear-sky inputs are flagged as fallback."""
+    times, ghi, dhi, temp_air = table.fallback_inputs(
+        datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp(), 48, 0.8
+    )
+
+    blocks = list(
+        iter_forecast(
+            times, ghi, dhi, temp_air, LATITUDE, LONGITUDE, plant, [], fallback=True
+        )
+    )
+
+    assert len(blocks) == 2
+    assert all(block.fallback for block in blocks)
+    assert blocks[-1].stats[1, -1].max() > 0
@@ -0,0 +1,63 @@
+"""Tests for the options flow."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ..config_flow import OpenMeteoPVForecastOptionsFlow
+from ..const import (
+    CONF_ARCHIVE_DAYS,
+    CONF_COMPACT,
+    CONF_DEADBAND,
+    CONF_QUANTILES,
+    CONF_WEATHER_MODEL,
+)
+
+OPTIONS = {
+    CONF_WEATHER_MODEL: "icon_d2",
+    "inverters": [{"name": "west", "size_w": 8000.0}],
+    "strings": [],
+    CONF_QUANTILES: [10.0, 90.0],
+    CONF_DEADBAND: 20.0,
+}
+
+
+def options_flow() -> OpenMeteoPVForecastOptionsFlow:
+    """Return an options flow for an entry with ``OPTIONS``."""
+    flow = OpenMeteoPVForecastOptionsFlow(SimpleNamespace(options=OPTIONS))
+    flow.flow_id = "flow"
+    flow.handler = "entry"
+    return flow
+
+
+@pytest.mark.parametrize(
+    ("step", "user_input", "changes"),
+    [
+        ("edit_quantiles", {CONF_QUANTILES: ["75", "25"]}, {CONF_QUANTILES: [25, 75]}),
+        ("edit_deadband", {CONF_DEADBAND: 50}, {CONF_DEADBAND: 50.0}),
+        (
+            "edit_memory",
+            {CONF_COMPACT: True, CONF_ARCHIVE_DAYS: 30.0},
+            {CONF_COMPACT: True, CONF_ARCHIVE_DAYS: 30},
+        ),
+    ],
+)
+def test_steps_keep_other_options(step, user_input, changes) -> None:
+    """Each step only changes its own options."""
+    flow = options_flow()
+
+    result = asyncio.run(getattr(flow, f"async_step_{step}")(user_input))
+
+    assert result["data"] == {**OPTIONS, **changes}
+
+
+def test_plant_edits_are_saved_with_later_steps() -> None:
+    """Inverters edited earlier in the flow are saved by the next step."""
+    flow = options_flow()
+    flow.inverters = [{"name": "east", "size_w": 5000.0}]
+
+    result = asyncio.run(flow.async_step_edit_deadband({CONF_DEADBAND: 5}))
+
+    assert result["data"]["inverters"] == [{"name": "east", "size_w": 5000.0}]
+    assert OPTIONS["inverters"] == [{"name": "west", "size_w": 8000.0}]
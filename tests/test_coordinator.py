@@ -0,0 +1,128 @@
+"""Tests for the forecast coordinator."""
+
+import asyncio
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .. import solar_forecast
+from ..coordinator import OpenMeteoPVForecastCoordinator
+from ..solar_forecast import WorkBuffers, compute_forecast, local_day_ends
+
+BERLIN = ZoneInfo("Europe/Berlin")
+OPTIONS = {
+    "quantiles": [10, 90],
+    "inverters": [
+        {"name": "west", "size_w": 8000, "max_ac_w": 4000, "inverter_eff": 0.97},
+        {"name": "east", "size_w": 5000},
+    ],
+    "strings": [
+        {
+            "string_name": "south",
+            "inverter": "west",
+            "azimuth": 180,
+            "tilt": 30,
+            "power_w": 3000,
+        },
+        {
+            "string_name": "garage",
+            "inverter": "east",
+            "azimuth": 90,
+            "tilt": 15,
+            "power_w": 2000,
+        },
+    ],
+}
+
+
+@pytest.fixture
+def berlin():
+    """Run the test in the Europe/Berlin time zone."""
+    dt_util.set_default_time_zone(BERLIN)
+    yield
+    dt_util.set_default_time_zone(ZoneInfo("UTC"))
+
+
+def run_coordinator(tmp_path, test) -> None:
+    """Run ``test`` with a coordinator whose model is loaded."""
+
+    async def _run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        hass.config.latitude = 52.5
+        hass.config.longitude = 13.4
+        coordinator = OpenMeteoPVForecastCoordinator(
+            hass, SimpleNamespace(entry_id="entry", options=OPTIONS)
+        )
+        coordinator._model = solar_forecast
+        coordinator._buffers = WorkBuffers()
+        await test(coordinator)
+        await hass.async_stop(force=True)
+
+    asyncio.run(_run())
+
+
+def test_compute_in_local_day_blocks(tmp_path, weather, berlin) -> None:
+    """The coordinator runs the model in local days on the executor."""
+    times, ghi, dhi, temp_air = weather
+
+    async def test(coordinator) -> None:
+        blocks = list(coordinator._model_blocks(*weather))
+        data = await coordinator._async_compute(weather)
+        expected = compute_forecast(
+            *weather, 52.5, 13.4, coordinator.plant, [10, 90], tz=BERLIN
+        )
+
+        assert [len(block.times) for block in blocks] == local_day_ends(
+            times, 3600, BERLIN
+        )
+        np.testing.assert_allclose(data.stats, expected.stats)
+        assert not data.fallback
+
+    run_coordinator(tmp_path, test)
+
+
+def test_compute_publishes_today_early(tmp_path, weather, berlin) -> None:
+    """Sensors get the forecast up to midnight before the rest is done."""
+    _, ghi, dhi, temp_air = weather
+    now = dt_util.utcnow().timestamp()
+    times = 3600 * (now // 3600 + np.arange(1, ghi.shape[1] + 1))
+    published: list[int] = []
+
+    async def test(coordinator) -> None:
+        coordinator.async_update_listeners = lambda: published.append(
+            len(coordinator.data.times)
+        )
+        data = await coordinator._async_compute((times, ghi, dhi, temp_air))
+
+        assert published == [local_day_ends(times, 3600, BERLIN)[0]]
+        assert len(data.times) == len(times)
+
+    run_coordinator(tmp_path, test)
+
+
+def test_compute_marks_fallback(tmp_path, weather) -> None:
+    """Forecasts from clear-sky inputs are flagged."""
+
+    async def test(coordinator) -> None:
+        data = await coordinator._async_compute(weather, fallback=True)
+
+        assert data.fallback
+
+    run_coordinator(tmp_path, test)
+
+
+def test_compute_without_slots(tmp_path) -> None:
+    """An empty response fails the update instead of publishing nothing."""
+    empty = np.empty((5, 0))
+
+    async def test(coordinator) -> None:
+        with pytest.raises(UpdateFailed):
+            await coordinator._async_compute((np.array([]), empty, empty, empty))
+
+    run_coordinator(tmp_path, test)
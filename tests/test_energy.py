@@ -0,0 +1,60 @@
+"""Tests for the Energy dashboard forecast."""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from ..const import DOMAIN
+from ..energy import async_get_solar_forecast
+from ..solar_forecast import compute_forecast, hourly_energy
+from .conftest import START
+
+
+@pytest.mark.parametrize(
+    ("slot_seconds", "power", "hours", "energy"),
+    [
+        (900, [400, 800, 1200, 1600, 2000], [START, START + 3600], [1000, 500]),
+        (3600, [100, 200], [START, START + 3600], [100, 200]),
+        (10800, [300, 600], [START, START + 10800], [900, 1800]),
+    ],
+)
+def test_hourly_energy_buckets_slots(slot_seconds, power, hours, energy) -> None:
+    """Slot power is summed into the hour each slot starts in."""
+    times = START + slot_seconds * np.arange(1, len(power) + 1)
+
+    starts, wh = hourly_energy(times, slot_seconds, np.array(power, dtype=float))
+
+    assert starts.tolist() == hours
+    np.testing.assert_allclose(wh, energy)
+
+
+def test_forecast_buckets_match_plant_median(plant, weather) -> None:
+    """Each model run carries the hourly plant median energy."""
+    data = compute_forecast(*weather, 52.5, 13.4, plant, [])
+
+    assert len(data.wh_hours) == len(data.times)
+    assert next(iter(data.wh_hours)) == "2024-06-01T00:00:00+00:00"
+    np.testing.assert_allclose(
+        list(data.wh_hours.values()), data.stats[1, -1], atol=0.05
+    )
+
+
+def test_solar_forecast_of_entry(plant, weather) -> None:
+    """The Energy platform serves the buckets of the current forecast."""
+    data = compute_forecast(*weather, 52.5, 13.4, plant, [])
+    hass = SimpleNamespace(
+        data={
+            DOMAIN: {
+                "entry": SimpleNamespace(data=data),
+                "pending": SimpleNamespace(data=None),
+            }
+        }
+    )
+
+    assert asyncio.run(async_get_solar_forecast(hass, "entry")) == {
+        "wh_hours": data.wh_hours
+    }
+    assert asyncio.run(async_get_solar_forecast(hass, "pending")) is None
+    assert asyncio.run(async_get_solar_forecast(hass, "missing")) is None
@@ -0,0 +1,58 @@
+"""Tests for the integration setup."""
+
+import asyncio
+from pathlib import Path
+import subprocess
+import sys
+from types import SimpleNamespace
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR
+
+from .. import async_remove_entry
+from ..const import DOMAIN
+
+PACKAGE = __package__.rpartition(".")[0]
+
+
+def test_setup_modules_do_not_import_numpy() -> None:
+    """NumPy and the model are only imported when the first forecast runs."""
+    modules = ", ".join(
+        f"{PACKAGE}.{name}"
+        for name in ("config_flow", "coordinator", "energy", "sensor", "services")
+    )
+    code = f"import sys, {modules}; print('numpy' in sys.modules)"
+
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=Path(__file__).parents[2],
+        text=True,
+    )
+
+    assert result.stdout.strip() == "False"
+
+
+def test_remove_entry_deletes_archive_and_bias(tmp_path) -> None:
+    """Removing an entry deletes every file it stored."""
+    storage = tmp_path / STORAGE_DIR
+    (storage / DOMAIN).mkdir(parents=True)
+    files = [
+        storage / DOMAIN / "archive_entry.npy",
+        storage / DOMAIN / "archive_entry_previous.npy",
+        storage / f"{DOMAIN}.entry.bias",
+    ]
+    other = storage / f"{DOMAIN}.other.bias"
+    for path in (*files, other):
+        path.write_text("{}")
+
+    async def _run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        await async_remove_entry(hass, SimpleNamespace(entry_id="entry"))
+        await hass.async_stop(force=True)
+
+    asyncio.run(_run())
+
+    assert not any(path.exists() for path in files)
+    assert other.exists()
@@ -0,0 +1,100 @@
+"""Tests for the plant import and export."""
+
+import pytest
+
+from ..plant_io import FORMATS, InvalidPlant, export_plant, parse_plant
+
+PLANT_YAML = """
+inverters:
+  - name: west
+    size_w: 8000
+    max_ac_w: 4000
+  - name: east
+    size_w: 5000
+    actual_sensor: sensor.east_power
+strings:
+  - string_name: south
+    inverter: west
+    azimuth: 180
+    tilt: 30
+    power_w: 3000
+    horizon: [0, 0, 0, 0, 5, 5, 5, 5, 0, 0, 0, 0]
+    actual_sensor: sensor.south_power
+  - string_name: garage
+    inverter: east
+    azimuth: 90
+    tilt: 15
+    power_w: 2000
+    albedo: 0.3
+"""
+
+
+def test_parse_fills_defaults() -> None:
+    """Parsed records are validated and completed like in the config flow."""
+    inverters, strings = parse_plant(PLANT_YAML, "yaml")
+
+    assert inverters[0] == {
+        "name": "west",
+        "size_w": 8000.0,
+        "max_ac_w": 4000.0,
+        "inverter_eff": 0.98,
+    }
+    assert strings[1]["horizon"] == [0.0] * 12
+    assert strings[1]["albedo"] == 0.3
+    assert strings[1]["cell_coeff"] == 0.0328
+    assert strings[0]["actual_sensor"] == "sensor.south_power"
+
+
+@pytest.mark.parametrize("file_format", FORMATS)
+def test_export_round_trip(file_format: str) -> None:
+    """Exported plants parse back to the same options."""
+    inverters, strings = parse_plant(PLANT_YAML, "yaml")
+
+    text = export_plant({"inverters": inverters, "strings": strings}, file_format)
+
+    assert parse_plant(text, file_format) == (inverters, strings)
+
+
+def test_all_errors_are_reported() -> None:
+    """Duplicates and invalid records are collected in one error."""
+    content = """
+inverters:
+  - {name: a, size_w: 1000}
+  - {name: a, size_w: 2000}
+strings:
+  - {string_name: s, inverter: b, azimuth: 180, tilt: 30, power_w: 1000}
+  - {string_name: t, inverter: a, azimuth: 180, tilt: 30, power_w: 1000,
+     horizon: [1, 2]}
+  - {string_name: u, inverter: a, azimuth: 180, tilt: 30, power_w: 1000}
+  - {string_name: u, inverter: a, azimuth: 90, tilt: 30, power_w: 1000}
+"""
+    with pytest.raises(InvalidPlant) as err:
+        parse_plant(content, "yaml")
+
+    assert err.value.errors == [
+        "inverters[1].name: duplicate name a",
+        "strings[0].inverter: value must be one of ['a']",
+        "strings[1].horizon: expected 12 values",
+        "strings[3].string_name: duplicate name u",
+    ]
+
+
+@pytest.mark.parametrize(
+    ("content", "file_format", "error"),
+    [
+        ("[1, 2]", "yaml", "expected a mapping with inverters and strings"),
+        ('{"inverters": {}, "strings": []}', "json", "must be lists"),
+        ("type,name\nbattery,x\n", "csv", "line 2: type must be inverter or string"),
+        ("inverters: []\nstrings: []", "yaml", "at least one inverter is required"),
+    ],
+)
+def test_invalid_files(content: str, file_format: str, error: str) -> None:
+    """Malformed descriptions are rejected with a readable message."""
+    with pytest.raises(InvalidPlant, match=error):
+        parse_plant(content, file_format)
+
+
+def test_unparsable_json() -> None:
+    """Syntax errors are reported as invalid plants."""
+    with pytest.raises(InvalidPlant):
+        parse_plant("{", "json")
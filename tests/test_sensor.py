@@ -0,0 +1,136 @@
+"""Tests for the forecast sensors."""
+
+from types import SimpleNamespace
+
+import numpy as np
+
+from homeassistant.util import dt as dt_util
+
+from ..const import STAT_MEDIAN
+from ..sensor import (
+    SENSOR_DESCRIPTIONS,
+    TARGET_DESCRIPTIONS,
+    TARGET_INVERTER,
+    TARGET_PLANT,
+    TARGET_STRING,
+    ForecastView,
+    OpenMeteoPVForecastSensor,
+    OpenMeteoPVForecastTargetSensor,
+    forecast_targets,
+)
+from ..solar_forecast import compute_forecast
+
+
+class StubView:
+    """View returning a settable plant median."""
+
+    def __init__(self, value: float) -> None:
+        """Initialize the view."""
+        self.data = object()
+        self.median = value
+
+    def value(self, remaining: bool, kind: str, name: str, stat: str) -> float:
+        """Return the current median."""
+        return self.median
+
+
+class TargetView:
+    """View with settable medians of one string and the plant."""
+
+    def __init__(self, string: float, plant: float) -> None:
+        """Initialize the view."""
+        self.data = self.current = self.remaining = object()
+        self.rows = {(TARGET_STRING, "south"): 0, (TARGET_PLANT, TARGET_PLANT): 1}
+        self.stat_index = {STAT_MEDIAN: 0}
+        self.medians = {"south": string, TARGET_PLANT: plant}
+
+    def value(self, remaining: bool, kind: str, name: str, stat: str) -> float:
+        """Return the median of a target."""
+        return self.medians[name]
+
+
+def plant_sensor(view, deadband: float) -> tuple[OpenMeteoPVForecastTargetSensor, list]:
+    """Return a plant median power sensor and the states it writes."""
+    sensor = OpenMeteoPVForecastTargetSensor(
+        "entry",
+        view,
+        TARGET_DESCRIPTIONS[0],
+        deadband,
+        TARGET_PLANT,
+        TARGET_PLANT,
+        STAT_MEDIAN,
+    )
+    written: list[float] = []
+    sensor.hass = object()
+    sensor.async_write_ha_state = lambda: written.append(sensor.native_value)
+    return sensor, written
+
+
+def test_forecast_targets(plant) -> None:
+    """Strings come first, then inverters, then the plant."""
+    assert forecast_targets(plant) == [
+        (TARGET_STRING, "south"),
+        (TARGET_STRING, "roof"),
+        (TARGET_STRING, "garage"),
+        (TARGET_INVERTER, "west"),
+        (TARGET_INVERTER, "east"),
+        (TARGET_PLANT, TARGET_PLANT),
+    ]
+
+
+def test_view_values_of_current_slot(plant, weather) -> None:
+    """The view looks up the statistics of the slot containing now."""
+    times, ghi, dhi, temp_air = weather
+    now = dt_util.utcnow().timestamp()
+    times = times - times[0] + 3600 * (now // 3600 + 1)
+    data = compute_forecast(times, ghi, dhi, temp_air, 52.5, 13.4, plant, [10, 90])
+    view = ForecastView(SimpleNamespace(data=data))
+
+    assert view.refresh()
+
+    median = data.stats[1, :, 0]
+    assert view.value(False, TARGET_STRING, "roof", STAT_MEDIAN) == round(median[1], 1)
+    assert view.value(False, TARGET_PLANT, TARGET_PLANT, "p90") == round(
+        float(data.stats[4, data.plant_row, 0]), 1
+    )
+    assert view.value(False, TARGET_STRING, "missing", STAT_MEDIAN) is None
+    assert np.isfinite(view.value(True, TARGET_INVERTER, "east", STAT_MEDIAN))
+
+
+def test_view_without_data() -> None:
+    """Without a forecast the view has nothing to show."""
+    assert not ForecastView(SimpleNamespace(data=None)).refresh()
+
+
+def test_deadband_applies_to_slot_ticks_only() -> None:
+    """Slot ticks skip small changes; new forecasts are always written."""
+    view = StubView(1000.0)
+    sensor, written = plant_sensor(view, 50.0)
+    sensor.async_update_forecast(force=True)
+
+    view.median = 1020.0
+    sensor.async_update_forecast()
+    view.median = 1030.0
+    sensor.async_update_forecast(force=True)
+    view.median = 1100.0
+    sensor.async_update_forecast()
+
+    assert written == [1000.0, 1030.0, 1100.0]
+
+
+def test_new_forecast_writes_unchanged_state() -> None:
+    """Forced writes publish new attributes even if the state is the same."""
+    view = TargetView(0.0, 0.0)
+    sensor = OpenMeteoPVForecastSensor("entry", view, SENSOR_DESCRIPTIONS[0], 50.0)
+    written: list[dict] = []
+    sensor.hass = object()
+    sensor.async_write_ha_state = lambda: written.append(sensor.extra_state_attributes)
+
+    sensor.async_update_forecast(force=True)
+    view.medians["south"] = 10.0
+    sensor.async_update_forecast(force=True)
+    view.medians["south"] = 20.0
+    sensor.async_update_forecast()
+
+    assert sensor.native_value == 0.0
+    assert [attributes["south"][STAT_MEDIAN] for attributes in written] == [0.0, 10.0]
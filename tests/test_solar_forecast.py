@@ -0,0 +1,158 @@
+"""Tests for the PV forecast model."""
+
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pytest
+
+from ..const import statistic_keys
+from ..solar_forecast import (
+    WorkBuffers,
+    aggregate_members,
+    compute_forecast,
+    ensemble_statistics,
+    iter_forecast,
+    local_day_ends,
+    string_dc_power,
+)
+
+LATITUDE = 52.5
+LONGITUDE = 13.4
+BERLIN = ZoneInfo("Europe/Berlin")
+
+
+@pytest.mark.parametrize("count", [1, 2, 30, 51])
+def test_ensemble_statistics_match_numpy(count: int) -> None:
+    """Partial selection gives the same order statistics as a full sort."""
+    members = np.random.default_rng(count).normal(size=(4, count, 6))
+    quantiles = [5, 10, 33.3, 90, 99]
+    expected = np.concatenate(
+        (
+            np.quantile(members, [0, 0.5, 1], axis=1),
+            np.quantile(members, np.array(quantiles) / 100, axis=1),
+        )
+    )
+
+    stats = ensemble_statistics(members, quantiles)
+    buffered = ensemble_statistics(members, quantiles, WorkBuffers())
+
+    assert stats.shape == (len(statistic_keys(quantiles)), 4, 6)
+    np.testing.assert_allclose(stats, expected, atol=1e-12)
+    np.testing.assert_array_equal(buffered, stats)
+    np.testing.assert_array_equal(stats[0], members.min(axis=1))
+    np.testing.assert_array_equal(stats[2], members.max(axis=1))
+
+
+def test_ensemble_statistics_leave_members_untouched() -> None:
+    """The reused partition buffer keeps the member order intact."""
+    members = np.random.default_rng(3).normal(size=(2, 9, 4))
+    original = members.copy()
+
+    ensemble_statistics(members, [25, 75], WorkBuffers())
+
+    np.testing.assert_array_equal(members, original)
+
+
+def test_local_day_ends_split_at_local_midnight(weather) -> None:
+    """Blocks end where a slot starts at local midnight."""
+    times = weather[0]
+
+    ends = local_day_ends(times, 3600, BERLIN)
+
+    assert ends[-1] == len(times)
+    for end in ends[:-1]:
+        start = datetime.fromtimestamp(times[end] - 3600, BERLIN)
+        assert (start.hour, start.minute) == (0, 0)
+    # The first block is the rest of the first local day (UTC+2 in June)
+    assert ends[0] == 22
+
+
+def test_local_day_ends_of_dst_change() -> None:
+    """A day with a daylight saving change has 23 hourly slots."""
+    start = datetime(2024, 3, 30, tzinfo=BERLIN).timestamp()
+    times = start + 3600 * np.arange(1, 72, dtype=float)
+
+    ends = local_day_ends(times, 3600, BERLIN)
+
+    assert np.diff([0, *ends]).tolist()[:2] == [24, 23]
+
+
+def test_local_day_ends_without_slots() -> None:
+    """No slots give no blocks."""
+    assert local_day_ends(np.array([]), 3600, timezone.utc) == []
+
+
+@pytest.mark.parametrize("tz", [timezone.utc, BERLIN, ZoneInfo("Pacific/Auckland")])
+def test_chunked_forecast_matches_single_pass(plant, weather, tz) -> None:
+    """Computing day blocks gives the same result as the whole horizon at once."""
+    times, ghi, dhi, temp_air = weather
+    quantiles = [10, 90]
+    factors = {"south": 0.9}
+
+    data = compute_forecast(
+        times,
+        ghi,
+        dhi,
+        temp_air,
+        LATITUDE,
+        LONGITUDE,
+        plant,
+        quantiles,
+        string_factors=factors,
+        tz=tz,
+    )
+
+    inverter_index = [1 if s.inverter == "east" else 0 for s in plant.strings]
+    membership = np.zeros((2, 3))
+    membership[inverter_index, np.arange(3)] = 1
+    efficiency = np.array([0.97, 0.98])[inverter_index][:, np.newaxis, np.newaxis]
+    max_ac = np.array([4000, np.inf])
+    string_ac = efficiency * string_dc_power(
+        times - 1800, ghi, dhi, temp_air, LATITUDE, LONGITUDE, plant.strings
+    )
+    baseline = aggregate_members(string_ac, membership, max_ac).mean(axis=1)
+    string_ac[0] *= 0.9
+    members = aggregate_members(string_ac, membership, max_ac)
+
+    np.testing.assert_allclose(data.members, members, atol=1e-9)
+    np.testing.assert_allclose(data.baseline, baseline, atol=1e-9)
+    np.testing.assert_allclose(
+        data.stats, ensemble_statistics(members, quantiles), atol=1e-9
+    )
+    assert sum(data.wh_hours.values()) == pytest.approx(
+        np.round(data.stats[1, -1], 1).sum(), abs=1
+    )
+
+
+def test_iter_forecast_yields_growing_prefixes(plant, weather) -> None:
+    """Each block extends the previous data up to the next local midnight."""
+    times = weather[0]
+
+    blocks = list(iter_forecast(*weather, LATITUDE, LONGITUDE, plant, [], tz=BERLIN))
+
+    assert [len(data.times) for data in blocks] == local_day_ends(times, 3600, BERLIN)
+    first = blocks[0]
+    np.testing.assert_array_equal(first.stats, blocks[-1].stats[:, :, :22])
+
+
+def test_compact_forecast_is_float32(plant, weather) -> None:
+    """Compact mode stores members and statistics in single precision."""
+    data = compute_forecast(*weather, LATITUDE, LONGITUDE, plant, [25], compact=True)
+    reference = compute_forecast(*weather, LATITUDE, LONGITUDE, plant, [25])
+
+    assert data.members.dtype == data.stats.dtype == np.float32
+    np.testing.assert_allclose(data.stats, reference.stats, rtol=1e-5, atol=1e-3)
+
+
+def test_forecast_without_slots(plant) -> None:
+    """An empty response yields nothing and cannot be computed."""
+    empty = np.empty((5, 0))
+
+    assert not list(
+        iter_forecast(np.array([]), empty, empty, empty, LATITUDE, LONGITUDE, plant, [])
+    )
+    with pytest.raises(ValueError):
+        compute_forecast(
+            np.array([]), empty, empty, empty, LATITUDE, LONGITUDE, plant, []
+        )